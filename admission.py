@@ -0,0 +1,205 @@
+"""
+Admission control for the expensive requests: deck analysis, builds and
+LibreOffice thumbnail jobs.
+
+Each kind of work goes through a Gate: at most `limit` run at once, up to
+`queue_size` more wait, and anything past that is turned away with an
+estimate of when to retry (the app answers HTTP 429 with Retry-After).
+Waiters are served round-robin across users, so one user's burst of uploads
+queues behind itself instead of in front of everyone else. Every gate keeps
+counters and recent wait times for sizing hosts (report()).
+
+Threads wait with slot(); coroutines wait with aslot(), which holds no
+thread while queued, and both share the same limit and queue.
+"""
+
+import math
+import time
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager, asynccontextmanager
+
+import metrics
+
+WAIT_SAMPLES = 1024  # recent wait times kept per gate for percentiles
+EWMA = 0.2  # weight of the newest run in the average run time
+
+
+class Rejected(Exception):
+    """The gate's queue is full; retry_after is a guess in whole seconds."""
+
+    def __init__(self, gate, retry_after):
+        super().__init__(f"{gate} queue is full")
+        self.gate = gate
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    __slots__ = ("granted", "on_grant")
+
+    def __init__(self, on_grant=None):
+        self.granted = False
+        self.on_grant = on_grant
+
+
+class Gate:
+    """At most `limit` concurrent holders and `queue_size` waiters, fair across users."""
+
+    def __init__(self, name, limit, queue_size):
+        self.name = name
+        self.limit = max(1, limit)
+        self.queue_size = max(0, queue_size)
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = OrderedDict()  # user -> deque of tickets; order is the round-robin turn
+        self._queued = 0
+        self._run_seconds = None  # moving average, for Retry-After
+        self.admitted = self.rejected = self.completed = 0
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self._wait_total = 0.0
+
+    def _grant(self):
+        # Next waiter of the user whose turn it is; that user goes to the back
+        while self._active < self.limit and self._waiting:
+            user, tickets = next(iter(self._waiting.items()))
+            ticket = tickets.popleft()
+            if tickets:
+                self._waiting.move_to_end(user)
+            else:
+                del self._waiting[user]
+            self._queued -= 1
+            self._active += 1
+            ticket.granted = True
+            if ticket.on_grant is not None:
+                ticket.on_grant()
+        self._cond.notify_all()
+
+    def retry_after(self):
+        """Seconds until a queue slot is likely to free up."""
+        run = self._run_seconds or 1.0
+        return max(1, math.ceil(run * (self._queued + 1) / self.limit))
+
+    def _enqueue(self, user, on_grant=None):
+        # A granted ticket, or one in the user's queue; caller holds _cond
+        ticket = _Ticket(on_grant)
+        if self._active < self.limit and not self._waiting:
+            self._active += 1
+            ticket.granted = True
+            return ticket
+        if self._queued >= self.queue_size:
+            self.rejected += 1
+            raise Rejected(self.name, self.retry_after())
+        self._waiting.setdefault(user, deque()).append(ticket)
+        self._queued += 1
+        return ticket
+
+    def _admitted(self, started):
+        waited = time.perf_counter() - started
+        self.admitted += 1
+        self._waits.append(waited)
+        self._wait_total += waited
+
+    def acquire(self, user):
+        """Block until admitted; raises Rejected when the queue is full."""
+        started = time.perf_counter()
+        with self._cond:
+            ticket = self._enqueue(user)
+            while not ticket.granted:
+                self._cond.wait()
+            self._admitted(started)
+
+    async def acquire_async(self, user):
+        """acquire() for coroutines: waits on the running loop, not a thread."""
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        granted = asyncio.Event()
+        with self._cond:
+            ticket = self._enqueue(user, lambda: loop.call_soon_threadsafe(granted.set))
+        try:
+            if not ticket.granted:
+                await granted.wait()
+        except asyncio.CancelledError:
+            with self._cond:
+                if not ticket.granted:  # still queued: leave the queue
+                    tickets = self._waiting[user]
+                    tickets.remove(ticket)
+                    if not tickets:
+                        del self._waiting[user]
+                    self._queued -= 1
+                    raise
+            self.release()  # granted meanwhile: hand the slot on
+            raise
+        with self._cond:
+            self._admitted(started)
+
+    def release(self, seconds=None):
+        """Free a slot; `seconds` is how long the holder ran."""
+        with self._cond:
+            self._active -= 1
+            self.completed += 1
+            if seconds is not None:
+                self._run_seconds = seconds if self._run_seconds is None else (
+                    EWMA * seconds + (1 - EWMA) * self._run_seconds)
+            self._grant()
+
+    @contextmanager
+    def slot(self, user):
+        """with gate.slot(user): ... runs admitted work (raises Rejected)."""
+        self.acquire(user)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - started)
+
+    @asynccontextmanager
+    async def aslot(self, user):
+        """async with gate.aslot(user): ... like slot(), from a coroutine."""
+        await self.acquire_async(user)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - started)
+
+    def report(self):
+        """Current depth, counters and wait times, ready for JSON."""
+        with self._cond:
+            waits = sorted(self._waits)
+            return {
+                "limit": self.limit,
+                "queue_size": self.queue_size,
+                "active": self._active,
+                "queued": self._queued,
+                "waiting_users": len(self._waiting),
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "wait_ms": {
+                    "total": round(self._wait_total * 1000, 3),
+                    "p50": round(metrics.percentile(waits, 50) * 1000, 3),
+                    "p95": round(metrics.percentile(waits, 95) * 1000, 3),
+                    "max": round(waits[-1] * 1000, 3) if waits else 0.0,
+                },
+                "avg_run_ms": round((self._run_seconds or 0.0) * 1000, 3),
+            }
+
+
+class Admission:
+    """Named gates, created on first use from {name: (limit, queue_size)}."""
+
+    def __init__(self, limits):
+        self.limits = limits
+        self.gates = {}
+        self._lock = threading.Lock()
+
+    def gate(self, name):
+        with self._lock:
+            gate = self.gates.get(name)
+            if gate is None:
+                gate = self.gates[name] = Gate(name, *self.limits[name])
+            return gate
+
+    def report(self):
+        return {name: self.gate(name).report() for name in self.limits}
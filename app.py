@@ -5,90 +5,225 @@ Opens at http://localhost:5000
 """
 
 import os
+import sys
 import json
+import time
+import argparse
 import webbrowser
 import threading
-from flask import Flask, request, jsonify, send_file, send_from_directory
+import gzip
+import shutil
+import functools
+from collections import OrderedDict
+import hmac
+from flask import Flask, request, jsonify, send_file, send_from_directory, g, has_request_context
 from werkzeug.utils import secure_filename
 
-from detector import analyze_deck, SLIDE_TYPES, SLIDE_TYPE_LABELS, SLIDE_TYPE_DESCRIPTIONS
-from mapper import map_slide
-import template_slick
-import template_colorful
-import subprocess
+from detector import (analyze_deck, SLIDE_TYPES, SLIDE_TYPE_LABELS, SLIDE_TYPE_DESCRIPTIONS,
+                      RuleStats, PROCESS_RULE_STATS)
+from mapper import map_slide, premap_candidates
+import engine
+import admission
+import sandbox
+import jobstore
+import backend_svg
+import wireframe
+import thumbnails
+import metrics
+import profiling
 import base64
-import glob
+
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
 
 app = Flask(__name__, static_folder='static')
 app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(__file__), 'uploads')
 app.config['OUTPUT_FOLDER'] = os.path.join(os.path.dirname(__file__), 'output')
 app.config['THUMB_FOLDER'] = os.path.join(os.path.dirname(__file__), 'thumbs')
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB
+app.config['COMPRESS_MIN_SIZE'] = 1024  # gzip/brotli JSON and SVG responses from this size
+app.json.compact = True
+# Admission control: (max running, max queued) per kind of work; past that, 429 + Retry-After
+# (queued thumbnail jobs wait on an event loop, not a thread, so their queue can be long)
+app.config['ADMISSION'] = {"analysis": (2, 8), "build": (2, 8), "thumbnails": (2, 100)}
+# Analyses and builds run in worker processes (sandbox.py); mapping and previews stay here
+app.config['ISOLATE_JOBS'] = True
+app.config['JOB_WORKERS'] = None  # None: as many as analyses + builds may run at once
+app.config['JOB_TIMEOUT'] = 300  # seconds per analysis or build
+app.config['JOB_MAX_RSS_MB'] = 2048  # per worker (Linux); over it the job is killed
+app.config['JOB_MAX_JOBS'] = 50  # jobs per worker before it is replaced
+# Where uploads' job state lives (jobstore.py): None for this process only, or
+# "sqlite:///path/jobs.db" to share it between several server processes
+app.config['JOB_STORE'] = None
+app.config['JOB_CACHE_SIZE'] = 8  # jobs whose analysis and mapped slides each process keeps
+# Development only (python app.py sets it): requests without a job use the latest
+# upload. Honoured only with the in-process store, where every user is the same one
+app.config['LATEST_JOB_FALLBACK'] = False
+# Shared directory for /metrics across server processes (serve.py sets it); None: this process only
+app.config['METRICS_DIR'] = None
+# Profiling single requests (profiling.py): off unless a token is set (--profile-token);
+# a request with X-Profile: <token> or ?profile=<token> is profiled and saved
+app.config['PROFILE_TOKEN'] = None
+app.config['PROFILE_FOLDER'] = os.path.join(os.path.dirname(__file__), 'profiles')
+app.config['PROFILE_KEEP'] = 50  # newest profiles kept
+app.config['INSTRUMENT_RULES'] = False  # per-section detector timings (--instrument-rules)
+app.config['STREAM_BUILDS'] = True  # write each slide to the .pptx as it is built (streaming.py)
+app.config['BUILD_COMPRESSLEVEL'] = None  # zlib level 0-9 for built decks; None = zlib default
+app.config['BUILD_WORKERS'] = None  # >1: render big decks in that many processes (--build-workers)
 
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['OUTPUT_FOLDER'], exist_ok=True)
 os.makedirs(app.config['THUMB_FOLDER'], exist_ok=True)
 
-# Store analysis results in memory (single-user tool)
-_current_analysis = None
-_current_file = None
-_thumbnails_available = False
-
-
-def _check_libreoffice():
-    """Check if LibreOffice is available."""
-    for cmd in ['soffice', '/Applications/LibreOffice.app/Contents/MacOS/soffice',
-                'libreoffice', '/usr/bin/libreoffice']:
-        try:
-            subprocess.run([cmd, '--version'], capture_output=True, timeout=5)
-            return cmd
-        except (FileNotFoundError, subprocess.TimeoutExpired):
-            continue
-    return None
-
-
-def _generate_thumbnails(pptx_path):
-    """Generate slide thumbnail images using LibreOffice + pdftoppm."""
-    soffice = _check_libreoffice()
-    if not soffice:
-        return False
-
-    thumb_dir = app.config['THUMB_FOLDER']
-    # Clear old thumbnails
-    for f in glob.glob(os.path.join(thumb_dir, 'slide-*')):
-        os.remove(f)
-
-    try:
-        # Convert to PDF
-        pdf_path = os.path.join(thumb_dir, 'slides.pdf')
-        subprocess.run([
-            soffice, '--headless', '--convert-to', 'pdf',
-            '--outdir', thumb_dir, pptx_path
-        ], capture_output=True, timeout=30)
-
-        # Find the generated PDF (filename may vary)
-        pdfs = glob.glob(os.path.join(thumb_dir, '*.pdf'))
-        if not pdfs:
-            return False
-        pdf_path = pdfs[0]
-
-        # Convert PDF pages to JPEG thumbnails
-        subprocess.run([
-            'pdftoppm', '-jpeg', '-r', '120',
-            pdf_path, os.path.join(thumb_dir, 'slide')
-        ], capture_output=True, timeout=30)
-
-        # Check if thumbnails were created
-        thumbs = sorted(glob.glob(os.path.join(thumb_dir, 'slide-*.jpg')))
-        return len(thumbs) > 0
-
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        return False
-
-
-def _get_thumbnail_b64(slide_num):
+# Each upload is a job, and its state is kept in the job store under the job id:
+#   file       path of the uploaded deck (uploads/<job id>/)
+#   analysis   analyze_deck() result
+#   rule_stats detector counters as a dict, if instrumented
+#   build      slide types as of the last build, with a revision the client builds against
+#   thumbnails LibreOffice thumbnails (thumbs/<job id>/): "pending", "ready" or "unavailable"
+_store = None  # opened on first use, from JOB_STORE
+_store_lock = threading.Lock()
+# What this process has worked out for recent jobs, by job id: the analysis,
+# mapped slides by (slide number, slide type), filled in the background after
+# an upload (until the job's "cancel" event is set: the job was dropped), and
+# each slide's (slide type, mapped dict, config digest) as last built
+_job_cache = OrderedDict()
+_job_cache_lock = threading.Lock()
+_thumbnails = None  # thumbnails.Renderer: LibreOffice runs on an event loop, started on first use
+_thumbnails_lock = threading.Lock()
+_admission = admission.Admission(app.config['ADMISSION'])  # gates are made on first use
+_jobs = None  # sandbox.WorkerPool, started at startup or on the first job
+_jobs_lock = threading.Lock()
+_metrics_dumping = False
+_profile_lock = threading.Lock()  # one profiled request at a time
+
+
+def _thumbnail_renderer():
+    global _thumbnails
+    with _thumbnails_lock:
+        if _thumbnails is None:
+            _thumbnails = thumbnails.Renderer(_admission.gate("thumbnails"))
+        return _thumbnails
+
+
+def _job_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = jobstore.open_store(app.config['JOB_STORE'])
+        return _store
+
+
+class JobRequired(Exception):
+    """A job-scoped request that didn't say which job."""
+
+
+def _job_id():
+    """The job a request is about: ?job= or "job" in the JSON body (the latest
+    upload instead, under LATEST_JOB_FALLBACK). None if there is no such job
+    (any more); JobRequired if the request names none."""
+    job_id = request.args.get('job') or (request.get_json(silent=True) or {}).get('job')
+    if job_id is None:
+        if not (app.config['LATEST_JOB_FALLBACK'] and isinstance(_job_store(), jobstore.MemoryStore)):
+            raise JobRequired()
+        job_id = _job_store().latest()
+    elif not (jobstore.valid_id(job_id) and _job_store().exists(job_id)):
+        job_id = None
+    g.job_id = job_id
+    return job_id
+
+
+def _new_entry(analysis):
+    return {"analysis": analysis, "premapped": {}, "configs": {}, "cancel": threading.Event()}
+
+
+def _cache_job(job_id, entry):
+    with _job_cache_lock:
+        entry = _job_cache.setdefault(job_id, entry)
+        _job_cache.move_to_end(job_id)
+        while len(_job_cache) > app.config['JOB_CACHE_SIZE']:
+            _job_cache.popitem(last=False)[1]["cancel"].set()
+        return entry
+
+
+def _job(job_id):
+    """This process's cache entry for a job, its analysis loaded from the store if need be."""
+    with _job_cache_lock:
+        entry = _job_cache.get(job_id)
+        if entry is not None:
+            _job_cache.move_to_end(job_id)
+            return entry
+    analysis = _job_store().get(job_id, "analysis") or []
+    return _cache_job(job_id, _new_entry(analysis))
+
+
+def _premapped(premapped, slide_data, slide_type):
+    """A slide's mapped dict for a type, from the job's premap cache if it's there."""
+    key = (slide_data["number"], slide_type)
+    mapped = premapped.get(key)
+    if mapped is None:
+        metrics.inc("cache_misses_total", cache="premap", slide_type=slide_type)
+        mapped = premapped[key] = map_slide(slide_data, slide_type)
+    else:
+        metrics.inc("cache_hits_total", cache="premap", slide_type=slide_type)
+    return mapped
+
+
+def _drop_jobs(job_ids):
+    """Stop the premapping of jobs dropped from the store and delete their
+    uploads, built decks and thumbnails."""
+    for job_id in job_ids:
+        with _job_cache_lock:
+            entry = _job_cache.pop(job_id, None)
+        if entry is not None:
+            entry["cancel"].set()
+        for folder in ('UPLOAD_FOLDER', 'OUTPUT_FOLDER', 'THUMB_FOLDER'):
+            shutil.rmtree(os.path.join(app.config[folder], job_id), ignore_errors=True)
+
+
+def _job_pool():
+    global _jobs
+    with _jobs_lock:
+        if _jobs is None:
+            size = app.config['JOB_WORKERS'] or sum(
+                app.config['ADMISSION'][name][0] for name in ("analysis", "build"))
+            max_rss = app.config['JOB_MAX_RSS_MB']
+            _jobs = sandbox.WorkerPool(size, timeout=app.config['JOB_TIMEOUT'],
+                                       max_rss=max_rss << 20 if max_rss else None,
+                                       max_jobs=app.config['JOB_MAX_JOBS'],
+                                       initializer=engine.warm,
+                                       preload=("detector", "engine", "profiling"))
+        return _jobs
+
+
+def _run_job(func, *args, **kwargs):
+    """Run an analysis or build in a worker process (ISOLATE_JOBS), else in this one."""
+    if not app.config['ISOLATE_JOBS']:
+        return func(*args, **kwargs)
+    profile = g.get('profile') if has_request_context() else None
+    if profile is not None:  # profile the job where it runs, too
+        result, data = _job_pool().run(profiling.profiled, func, *args, **kwargs)
+        profile.add(data)
+        return result
+    return _job_pool().run(func, *args, **kwargs)
+
+
+def _analyze_job(pptx_path, instrument):
+    """analyze_deck, plus its rule stats counters if instrumented (they pickle)."""
+    rule_stats = RuleStats() if instrument else None
+    analysis = analyze_deck(pptx_path, rule_stats=rule_stats)
+    return analysis, rule_stats.to_dict() if rule_stats else None
+
+
+def _client_id():
+    """Who a request is from, for fair queueing: X-Client-Id if sent, else the address."""
+    return request.headers.get('X-Client-Id') or request.remote_addr or "-"
+
+
+def _get_thumbnail_b64(thumb_dir, slide_num):
     """Get base64-encoded thumbnail for a slide number."""
-    thumb_dir = app.config['THUMB_FOLDER']
     # pdftoppm names files like slide-01.jpg, slide-02.jpg, etc.
     patterns = [
         os.path.join(thumb_dir, f'slide-{slide_num:02d}.jpg'),
@@ -135,6 +270,103 @@ def _build_text_structure(slide_data):
     return structure
 
 
+# Per-slide fields of the upload response, computed only when selected
+# (?fields=number,detected_type,...). text_structure and wireframe are left
+# out by default: the UI asks for wireframe, and fetches text_structure per
+# slide from /api/text-structure/<n> when it is opened.
+SLIDE_FIELDS = {
+    "number": lambda s: s["number"],
+    "detected_type": lambda s: s["detected_type"],
+    "confidence": lambda s: round(s["confidence"], 2),
+    "reason": lambda s: s["reason"],
+    "candidates": lambda s: s.get("candidates", []),
+    "preview": lambda s: s["preview"],
+    "total_words": lambda s: s["total_words"],
+    "text_boxes": lambda s: s["text_boxes"],
+    "has_chart": lambda s: s["has_chart"],
+    "has_image": lambda s: s["has_image"],
+    "text_structure": _build_text_structure,
+    "wireframe": wireframe.render,
+}
+DEFAULT_SLIDE_FIELDS = tuple(f for f in SLIDE_FIELDS if f not in ("text_structure", "wireframe"))
+COMPRESSIBLE = ("application/json", "image/svg+xml")
+
+
+def _is_admin(token):
+    """Whether a request presented the profiling token."""
+    expected = app.config['PROFILE_TOKEN']
+    return bool(expected and token) and hmac.compare_digest(token.encode(), expected.encode())
+
+
+@app.before_request
+def start_profile():
+    """Profile this request if it asks to (X-Profile / ?profile=) with the admin token.
+    One request at a time per process: cProfile can't nest."""
+    if request.endpoint in ("profiles", "profile_file"):
+        return
+    if not _is_admin(request.headers.get('X-Profile') or request.args.get('profile')):
+        return
+    if not _profile_lock.acquire(blocking=False):
+        g.profile_skipped = True
+        return
+    g.profile = profiling.Profile()
+    g.profile.start()
+
+
+# Registered before compress, so it runs after it and the profile covers it too
+@app.after_request
+def save_profile(response):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        try:
+            profile.stop()
+            name = profiling.new_name(request.endpoint or "request")
+            job_dir = g.get('job_id') or "none"
+            profile.save(os.path.join(app.config['PROFILE_FOLDER'], job_dir), name, {
+                "job": job_dir, "endpoint": request.endpoint, "path": request.path,
+                "method": request.method, "status": response.status_code,
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            })
+            profiling.prune(app.config['PROFILE_FOLDER'], app.config['PROFILE_KEEP'])
+            response.headers["X-Profile-Id"] = "%s/%s" % (job_dir, name)
+        finally:
+            _profile_lock.release()
+    elif g.get('profile_skipped'):
+        response.headers["X-Profile-Id"] = "skipped: another request is being profiled"
+    return response
+
+
+@app.teardown_request
+def drop_profile(exc):
+    """A request that failed before after_request: stop its profile unsaved."""
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profile.stop()
+        _profile_lock.release()
+
+
+@app.after_request
+def compress(response):
+    """Brotli (if installed) or gzip, as the client accepts, for larger text responses."""
+    if response.direct_passthrough or response.mimetype not in COMPRESSIBLE:
+        return response
+    # Whether or not this one is compressed, the same URL can be, so caches must key on it
+    response.vary.add("Accept-Encoding")
+    if response.status_code != 200 or "Content-Encoding" in response.headers:
+        return response
+    data = response.get_data()
+    if len(data) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+    accept = request.accept_encodings
+    if brotli is not None and accept.quality("br"):
+        response.set_data(brotli.compress(data, quality=5))
+        response.headers["Content-Encoding"] = "br"
+    elif accept.quality("gzip"):
+        response.set_data(gzip.compress(data, compresslevel=6))
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
 @app.route('/')
 def index():
     return send_from_directory('static', 'index.html')
@@ -142,51 +374,57 @@ def index():
 
 @app.route('/api/upload', methods=['POST'])
 def upload():
-    global _current_analysis, _current_file
-
     if 'file' not in request.files:
         return jsonify({"error": "No file uploaded"}), 400
+    fields = DEFAULT_SLIDE_FIELDS
+    if request.args.get('fields'):
+        fields = request.args['fields'].split(',')
+        unknown = [f for f in fields if f not in SLIDE_FIELDS]
+        if unknown:
+            return jsonify({"error": "Unknown field(s): " + ", ".join(unknown)}), 400
 
     f = request.files['file']
     if not f.filename.endswith('.pptx'):
         return jsonify({"error": "Please upload a .pptx file"}), 400
 
+    job_id = g.job_id = jobstore.new_id()
     filename = secure_filename(f.filename)
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    f.save(filepath)
+    upload_dir = os.path.join(app.config['UPLOAD_FOLDER'], job_id)
+    os.makedirs(upload_dir)
+    filepath = os.path.join(upload_dir, filename)
+    with metrics.timer("upload_save_seconds"):
+        f.save(filepath)
 
     try:
-        analysis = analyze_deck(filepath)
-        _current_analysis = analysis
-        _current_file = filepath
-
-        # Try to generate thumbnails
-        has_thumbs = _generate_thumbnails(filepath)
-
-        slides_out = []
-        for s in analysis:
-            sr = {
-                "number": s["number"],
-                "detected_type": s["detected_type"],
-                "confidence": round(s["confidence"], 2),
-                "reason": s["reason"],
-                "candidates": s.get("candidates", []),
-                "preview": s["preview"],
-                "total_words": s["total_words"],
-                "has_chart": s["has_chart"],
-                "has_image": s["has_image"],
-                "text_structure": _build_text_structure(s),
-            }
-            if has_thumbs:
-                thumb = _get_thumbnail_b64(s["number"])
-                if thumb:
-                    sr["thumbnail"] = thumb
-            slides_out.append(sr)
+        with _admission.gate("analysis").slot(_client_id()):
+            analysis, stats = _run_job(_analyze_job, filepath, app.config['INSTRUMENT_RULES'])
+        if stats is not None and app.config['ISOLATE_JOBS']:
+            PROCESS_RULE_STATS.merge(stats)  # analyze_deck counted it in the worker's process
+        build_state = {"revision": 0, "types": {s["number"]: s["detected_type"] for s in analysis}}
+        dropped = _job_store().create(job_id, {
+            "file": filepath, "analysis": analysis, "rule_stats": stats,
+            "build": build_state, "thumbnails": "pending",
+        })
+        _drop_jobs(dropped)
+        entry = _cache_job(job_id, _new_entry(analysis))
+
+        # Map every slide's top candidates while the user reviews the dropdowns
+        threading.Thread(target=premap_candidates,
+                         args=(analysis, entry["premapped"], 3, entry["cancel"]),
+                         daemon=True).start()
+
+        # LibreOffice thumbnails are slow: the UI shows wireframes until they are ready
+        _thumbnail_renderer().submit(filepath, os.path.join(app.config['THUMB_FOLDER'], job_id),
+                                     _client_id(), functools.partial(_job_store().set, job_id, "thumbnails"))
+
+        slides_out = [{f: SLIDE_FIELDS[f](s) for f in fields} for s in analysis]
 
         return jsonify({
+            "job": job_id,
             "filename": filename,
             "slide_count": len(analysis),
-            "has_thumbnails": has_thumbs,
+            "thumbnail_status": "pending",
+            "revision": build_state["revision"],
             "slides": slides_out,
             "available_types": [{
                 "value": t,
@@ -194,55 +432,306 @@ def upload():
                 "description": SLIDE_TYPE_DESCRIPTIONS.get(t, ""),
             } for t in SLIDE_TYPES],
         })
+    except (admission.Rejected, sandbox.JobError):
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        raise
     except Exception as e:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        metrics.inc("errors_total", stage="upload", kind="error")
         return jsonify({"error": str(e)}), 500
 
 
-@app.route('/api/build', methods=['POST'])
-def build():
-    global _current_analysis, _current_file
+NO_JOB = "No file analyzed yet. Upload a .pptx first."
 
-    if not _current_analysis or not _current_file:
-        return jsonify({"error": "No file analyzed yet. Upload a .pptx first."}), 400
 
-    data = request.json
+@app.route('/api/build', methods=['POST'])
+def build():
+    job_id = _job_id()
+    if job_id is None:
+        return jsonify({"error": NO_JOB}), 400
+    with _admission.gate("build").slot(_client_id()):
+        return _build(job_id, request.get_json(silent=True))
+
+
+def _slide_types(value, numbers):
+    """{slide number: slide type} from a build's {"7": "quote", ...};
+    ValueError naming what is wrong with it."""
+    if not isinstance(value, dict):
+        raise ValueError("expected an object of slide number: slide type")
+    types = {}
+    for key, slide_type in value.items():
+        try:
+            num = int(key)
+        except (TypeError, ValueError):
+            raise ValueError("not a slide number: %r" % key) from None
+        if num not in numbers:
+            raise ValueError("no slide %d" % num)
+        if slide_type not in SLIDE_TYPES:
+            raise ValueError("unknown slide type for slide %d: %r" % (num, slide_type))
+        types[num] = slide_type
+    return types
+
+
+def _build(job_id, data):
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object"}), 400
     template = data.get("template", "slick")
-    overrides = data.get("overrides", {})  # {"1": "section_divider", "3": "in_brief", ...}
-
-    # Build slide configs
-    slide_configs = []
-    for slide_data in _current_analysis:
-        num = str(slide_data["number"])
-        slide_type = overrides.get(num, slide_data["detected_type"])
-
+    if template not in engine.theme_names():
+        template = "slick"
+    entry = _job(job_id)
+    analysis = entry["analysis"]
+    numbers = {s["number"] for s in analysis}
+    key = "overrides" if "overrides" in data else "changes"
+    try:
+        requested = _slide_types(data.get(key, {}), numbers)
+    except ValueError as e:
+        return jsonify({"error": "Bad %s: %s" % (key, e)}), 400
+
+    # Either the slide types that changed since the build at "revision"
+    # ({"revision": 3, "changes": {"7": "quote"}}), or every override as
+    # {"overrides": {"1": "section_divider", ...}} (missing slides: detected type).
+    # Applied in one store update, so concurrent builds of a job get distinct revisions.
+    outcome = {}
+
+    def apply(state):
+        if key == "overrides":
+            changes = {s["number"]: requested.get(s["number"], s["detected_type"])
+                       for s in analysis}
+        elif data.get("revision") == state["revision"]:
+            changes = requested
+        else:
+            return state
+        types = dict(state["types"])
+        dirty = 0
+        for num, slide_type in changes.items():
+            if num in types and types[num] != slide_type:
+                types[num] = slide_type
+                dirty += 1
+        outcome["dirty"] = dirty
+        return {"revision": state["revision"] + (1 if dirty else 0), "types": types}
+
+    state = _job_store().update(job_id, "build", apply)
+    if state is None:
+        return jsonify({"error": NO_JOB}), 400
+    if "dirty" not in outcome:
+        return jsonify({"error": "Stale revision; send all overrides",
+                        "revision": state["revision"]}), 409
+
+    # Build slide configs: only slides whose type changed since this process
+    # last built them are mapped and hashed again
+    types, configs, premapped = state["types"], entry["configs"], entry["premapped"]
+    slide_configs, digests = [], []
+    for slide_data in analysis:
+        num = slide_data["number"]
+        slide_type = types[num]
         if slide_type == "skip":
             continue
 
-        mapped = map_slide(slide_data, slide_type)
-        slide_configs.append((slide_type, mapped))
+        cached = configs.get(num)
+        if cached is None or cached[0] != slide_type:
+            mapped = _premapped(premapped, slide_data, slide_type)
+            cached = configs[num] = (slide_type, mapped, engine.config_digest(mapped))
+        slide_configs.append(cached[:2])
+        digests.append(cached[2])
 
     # Build the deck
-    output_name = os.path.splitext(os.path.basename(_current_file))[0]
+    output_name = os.path.splitext(os.path.basename(_job_store().get(job_id, "file")))[0]
     output_name = f"{output_name}_{template}.pptx"
-    output_path = os.path.join(app.config['OUTPUT_FOLDER'], output_name)
+    output_dir = os.path.join(app.config['OUTPUT_FOLDER'], job_id)
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, output_name)
 
     try:
-        if template == "colorful":
-            template_colorful.build_deck(slide_configs, output_path)
-        else:
-            template_slick.build_deck(slide_configs, output_path)
-
-        return jsonify({"success": True, "filename": output_name})
+        _run_job(engine.build_deck, template, slide_configs, output_path,
+                 stream=app.config['STREAM_BUILDS'],
+                 compresslevel=app.config['BUILD_COMPRESSLEVEL'],
+                 workers=app.config['BUILD_WORKERS'], digests=digests)
+
+        return jsonify({"success": True, "job": job_id, "filename": output_name,
+                        "revision": state["revision"], "changed": outcome["dirty"]})
+    except sandbox.JobError:
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
+        metrics.inc("errors_total", stage="build", kind="error")
         return jsonify({"error": str(e)}), 500
 
 
+def _slide(job_id, number):
+    if job_id is None:
+        return None
+    return next((s for s in _job(job_id)["analysis"] if s["number"] == number), None)
+
+
+@app.route('/api/text-structure/<int:number>')
+def text_structure(number):
+    """The text boxes of one uploaded slide, for its "Original content" panel."""
+    slide_data = _slide(_job_id(), number)
+    if slide_data is None:
+        return jsonify({"error": "No slide %d" % number}), 404
+    return jsonify({"number": number, "text_structure": _build_text_structure(slide_data)})
+
+
+@app.route('/api/thumbnails')
+def thumbnail_images():
+    """LibreOffice thumbnails of an upload once rendered: {"status", "thumbnails"}."""
+    job_id = _job_id()
+    status = _job_store().get(job_id, "thumbnails", "unavailable") if job_id else "unavailable"
+    out = {"status": status}
+    if status == "ready":
+        thumb_dir = os.path.join(app.config['THUMB_FOLDER'], job_id)
+        thumbs = {}
+        for s in _job(job_id)["analysis"]:
+            thumb = _get_thumbnail_b64(thumb_dir, s["number"])
+            if thumb:
+                thumbs[s["number"]] = thumb
+        out["thumbnails"] = thumbs
+    return jsonify(out)
+
+
+@app.route('/api/preview/<int:number>')
+def preview(number):
+    """SVG previews of one slide as the given type and template (?type=&template=)."""
+    job_id = _job_id()
+    if job_id is None:
+        return jsonify({"error": NO_JOB}), 400
+    slide_data = _slide(job_id, number)
+    if slide_data is None:
+        return jsonify({"error": "No slide %d" % number}), 404
+    slide_type = request.args.get("type", slide_data["detected_type"])
+    template = request.args.get("template", "slick")
+    if template not in engine.theme_names():
+        template = "slick"
+    if slide_type == "skip":
+        return jsonify({"slides": []})
+
+    mapped = _premapped(_job(job_id)["premapped"], slide_data, slide_type)
+    theme = engine.load_theme(template)
+    slides = theme.render(slide_type, mapped)
+    return jsonify({"slides": backend_svg.render_slides(slides, theme.width, theme.height)})
+
+
+@app.errorhandler(admission.Rejected)
+def busy(e):
+    metrics.inc("errors_total", stage=request.endpoint, kind="busy")
+    return (jsonify({"error": "Server busy, try again in %d s" % e.retry_after, "gate": e.gate}),
+            429, {"Retry-After": str(e.retry_after)})
+
+
+@app.errorhandler(JobRequired)
+def job_required(e):
+    return jsonify({"error": "Which job? Send the id from /api/upload as ?job= (or \"job\" in the JSON body)"}), 400
+
+
+@app.errorhandler(sandbox.JobError)
+def job_failed(e):
+    if e.trace:
+        print(e.trace, file=sys.stderr)
+    metrics.inc("errors_total", stage=request.endpoint, kind=e.kind)
+    return jsonify(e.to_dict()), 504 if e.kind == "timeout" else 500
+
+
+@app.route('/api/admission')
+def admission_stats():
+    """Running, queued, rejected and wait-time figures per admission gate, and
+    the conversion workers' job counters."""
+    report = _admission.report()
+    if _jobs is not None:
+        report["workers"] = _jobs.report()
+    return jsonify(report)
+
+
+def _gauges():
+    """Gauges of this process, for metrics.render()."""
+    gauges = {}
+    for name, report in _admission.report().items():
+        gauges[("jobs_in_flight", (("gate", name),))] = report["active"]
+        gauges[("queue_depth", (("gate", name),))] = report["queued"]
+    if _jobs is not None:
+        report = _jobs.report()
+        gauges[("workers_busy", ())] = report["workers"] - report["idle"]
+    return gauges
+
+
+def _dump_metrics():
+    while True:
+        try:
+            metrics.dump(app.config['METRICS_DIR'], _gauges())
+        except OSError:
+            pass
+        time.sleep(metrics.DUMP_INTERVAL)
+
+
+@app.before_request
+def start_metrics_dump():
+    """With METRICS_DIR set, dump this process's metrics there in the background
+    (started on the first request, so after serve.py has forked)."""
+    global _metrics_dumping
+    if app.config['METRICS_DIR'] and not _metrics_dumping:
+        with _jobs_lock:
+            if not _metrics_dumping:
+                _metrics_dumping = True
+                threading.Thread(target=_dump_metrics, name="metrics-dump", daemon=True).start()
+
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Stage latencies, counters and gauges in Prometheus' text format."""
+    if app.config['METRICS_DIR']:
+        snap = metrics.collect(app.config['METRICS_DIR'], _gauges())
+    else:
+        snap = dict(metrics.snapshot(), gauges=_gauges())
+    return metrics.render(snap), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+
+@app.route('/api/profiles')
+def profiles():
+    """Newest saved request profiles with their slowest functions (admin token
+    as X-Profile or ?profile=; ?limit=)."""
+    if not _is_admin(request.headers.get('X-Profile') or request.args.get('profile')):
+        return jsonify({"error": "Profiling is off or the token is wrong."}), 403
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify({"profiles": profiling.recent(app.config['PROFILE_FOLDER'], limit)})
+
+
+@app.route('/api/profiles/<job>/<filename>')
+def profile_file(job, filename):
+    """A saved profile's .prof (pstats), .collapsed (flame graphs) or .json file."""
+    if not _is_admin(request.headers.get('X-Profile') or request.args.get('profile')):
+        return jsonify({"error": "Profiling is off or the token is wrong."}), 403
+    filepath = os.path.join(app.config['PROFILE_FOLDER'], secure_filename(job), secure_filename(filename))
+    if filename.endswith((".prof", ".collapsed", ".json")) and os.path.exists(filepath):
+        return send_file(filepath, as_attachment=True)
+    return jsonify({"error": "File not found"}), 404
+
+
+@app.route('/api/rule-stats')
+def rule_stats():
+    """Detector section hit counts and timings for a deck (?job=) and the
+    whole process."""
+    if not app.config['INSTRUMENT_RULES']:
+        return jsonify({"enabled": False,
+                        "error": "Rule instrumentation is off. Start with --instrument-rules."}), 404
+    job_id = _job_id()
+    stats = _job_store().get(job_id, "rule_stats") if job_id else None
+    deck = None
+    if stats is not None:
+        deck = RuleStats()
+        deck.merge(stats)
+    return jsonify({
+        "enabled": True,
+        "deck": deck.report() if deck else None,
+        "process": PROCESS_RULE_STATS.report(),
+    })
+
+
 @app.route('/api/download/<filename>')
 def download(filename):
-    filepath = os.path.join(app.config['OUTPUT_FOLDER'], secure_filename(filename))
-    if os.path.exists(filepath):
+    """A built deck of a job (?job=)."""
+    job_id = _job_id()
+    filepath = os.path.join(app.config['OUTPUT_FOLDER'], job_id or "-", secure_filename(filename))
+    if job_id and os.path.exists(filepath):
         return send_file(filepath, as_attachment=True)
     return jsonify({"error": "File not found"}), 404
 
@@ -255,10 +744,42 @@ def open_browser():
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Deck Converter web app")
+    parser.add_argument("--instrument-rules", action="store_true",
+                        help="record detector rule hits/timings, served at /api/rule-stats")
+    parser.add_argument("--build-workers", type=int, default=None,
+                        help="render large decks in this many worker processes")
+    parser.add_argument("--max-analyses", type=int, default=None,
+                        help="uploads analyzed at once (more wait in a queue)")
+    parser.add_argument("--max-builds", type=int, default=None,
+                        help="decks built at once (more wait in a queue)")
+    parser.add_argument("--queue-size", type=int, default=None,
+                        help="requests that may wait per kind of work before 429s")
+    parser.add_argument("--profile-token", default=None,
+                        help="allow profiling requests that send this token (X-Profile header)")
+    parser.add_argument("--job-store", default=None,
+                        help='where job state is kept: "memory" (default) or "sqlite:///path/jobs.db"')
+    args = parser.parse_args()
+    limits = app.config['ADMISSION']
+    for name, limit in (("analysis", args.max_analyses), ("build", args.max_builds)):
+        if limit is not None:
+            limits[name] = (limit, limits[name][1])
+    if args.queue_size is not None:
+        for name in limits:
+            limits[name] = (limits[name][0], args.queue_size)
+    app.config['INSTRUMENT_RULES'] = args.instrument_rules
+    app.config['BUILD_WORKERS'] = args.build_workers
+    app.config['JOB_STORE'] = args.job_store
+    app.config['PROFILE_TOKEN'] = args.profile_token
+    app.config['LATEST_JOB_FALLBACK'] = True  # one local user
+
     print("\n  Deck Converter")
     print("  ─────────────────────────────")
     print("  Opening http://localhost:5000")
     print("  Press Ctrl+C to stop\n")
 
+    engine.warm()  # previews fit text in this process; forked workers inherit it
+    if app.config['ISOLATE_JOBS']:
+        _job_pool()  # start the workers now, not on the first upload
     threading.Thread(target=open_browser, daemon=True).start()
     app.run(host='0.0.0.0', port=5000, debug=False)
@@ -0,0 +1,266 @@
+"""
+PPTX backend for display lists (display.py).
+
+Each primitive becomes a stamped shape (stamping.py), a copied source part
+(passthrough.py) or a python-pptx chart. Slides made only of shapes are
+cached by their display list: an identical slide in a later build gets the
+finished shape tree (kept serialized, which is far smaller than live lxml
+trees) instead of being stamped again.
+
+One level up, rendered slides can be exported: the slide part and every part
+it relates to, serialized into plain tuples that pickle (worker processes
+return them) and splice into another package with fresh partnames. Exported
+slide configs made only of shapes are cached under a key from the caller
+(engine: theme, slide type, config digest), so on a rebuild an unchanged
+slide is neither rendered nor re-serialized.
+"""
+
+import re
+import hashlib
+import weakref
+from copy import deepcopy
+from collections import OrderedDict
+
+from lxml import etree
+
+from pptx import Presentation
+from pptx.util import Pt
+from pptx.dml.color import RGBColor
+from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
+from pptx.enum.chart import XL_CHART_TYPE
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import qn
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT, RELATIONSHIP_TARGET_MODE as RTM
+from pptx.opc.package import Part, _Relationship
+from pptx.opc.packuri import PackURI
+from pptx.package import Package
+from pptx.parts.presentation import PresentationPart
+
+from display import PART_OPS, adds_parts
+from passthrough import add_chart, add_picture
+from stamping import RECT, OVAL, ROUNDED_RECT, stamp_shape, stamp_text
+
+ALIGN = {"left": PP_ALIGN.LEFT, "center": PP_ALIGN.CENTER, "right": PP_ALIGN.RIGHT}
+VALIGN = {"top": MSO_ANCHOR.TOP, "middle": MSO_ANCHOR.MIDDLE, "bottom": MSO_ANCHOR.BOTTOM}
+CHART_TYPES = {"bar": XL_CHART_TYPE.COLUMN_CLUSTERED, "line": XL_CHART_TYPE.LINE, "pie": XL_CHART_TYPE.PIE}
+_PROTOTYPES = {"rect": RECT, "oval": OVAL, "rounded": ROUNDED_RECT}
+
+SLIDE_CACHE_SIZE = 1024
+_slide_cache = OrderedDict()  # display list -> serialized shape tree of the rendered slide
+
+_bases = {}  # (width, height) -> parsed blank Presentation, shared and never written to
+
+PART_CACHE_SIZE = 4096
+_part_cache = OrderedDict()  # caller's key -> exported slides of one slide config
+
+# output package -> {(content type, sha1): Part} of the pictures spliced into it
+_spliced_pictures = weakref.WeakKeyDictionary()
+
+
+# ── PRIMITIVES ──
+
+def _background(slide, p):
+    fill = slide.background.fill
+    fill.solid(); fill.fore_color.rgb = RGBColor.from_string(p.color)
+
+
+def _shape(slide, p):
+    stamp_shape(slide, _PROTOTYPES[p.op], p.x, p.y, p.w, p.h, p.fill)
+
+
+def _text(slide, p):
+    stamp_text(slide, p.x, p.y, p.w, p.h, p.text, p.font, p.size, p.color, p.bold,
+               p.italic, ALIGN[p.align], VALIGN[p.valign], p.spacing)
+
+
+def _runs(slide, p):
+    tb = slide.shapes.add_textbox(p.x, p.y, p.w, p.h); tf = tb.text_frame; tf.word_wrap = True
+    para = tf.paragraphs[0]
+    color = RGBColor.from_string(p.color)
+    for text, bold in p.runs:
+        r = para.add_run(); r.text = text
+        r.font.name = p.font; r.font.size = Pt(p.size)
+        r.font.color.rgb = color; r.font.bold = bold
+    para.alignment = PP_ALIGN.LEFT
+    if p.spacing: para.line_spacing = Pt(p.spacing)
+    bp = tf._txBody.find(qn('a:bodyPr'))
+    if bp is not None: bp.set('anchor', 'ctr')
+
+
+def _picture(slide, p):
+    ref = {"source": p.source, "partname": p.partname, "width": p.src_w, "height": p.src_h}
+    add_picture(slide, ref, p.x, p.y, p.w, p.h)
+
+
+def _chart_ref(slide, p):
+    add_chart(slide, {"source": p.source, "partname": p.partname}, p.x, p.y, p.w, p.h)
+
+
+def _chart(slide, p):
+    from pptx.chart.data import CategoryChartData
+    chart_data = CategoryChartData()
+    if p.categories is not None:
+        chart_data.categories = p.categories
+    for name, values in p.series:
+        chart_data.add_series(name, values)
+    slide.shapes.add_chart(CHART_TYPES[p.chart_type], p.x, p.y, p.w, p.h, chart_data)
+
+
+OPS = {
+    "background": _background, "rect": _shape, "oval": _shape, "rounded": _shape,
+    "text": _text, "runs": _runs, "picture": _picture, "chart_ref": _chart_ref, "chart": _chart,
+}
+
+
+# ── SLIDES ──
+
+def render_slide(prs, items):
+    """Add one slide to `prs` and draw a display list on it."""
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    cacheable = not any(p.op in PART_OPS for p in items)
+    cached = _slide_cache.get(items) if cacheable else None
+    if cached is not None:
+        _slide_cache.move_to_end(items)
+        for p in items:
+            if p.op == "background":
+                _background(slide, p)
+        slide.shapes._spTree.extend(parse_xml(cached)[2:])
+        return slide
+
+    for p in items:
+        OPS[p.op](slide, p)
+    if cacheable:
+        _slide_cache[items] = etree.tostring(slide.shapes._spTree)
+        if len(_slide_cache) > SLIDE_CACHE_SIZE:
+            _slide_cache.popitem(last=False)
+    return slide
+
+
+def _copy_rels(src, dst, swap):
+    for rel in src.values():
+        target = rel.target_part
+        dst._rels[rel.rId] = _Relationship(dst._base_uri, rel.rId, rel.reltype,
+                                           rel._target_mode, swap.get(target, target))
+
+
+def new_deck(width, height):
+    """An empty presentation of the given slide size.
+
+    python-pptx's default template is parsed once per process and size. Each
+    deck gets its own copy of the presentation part (the only base part a
+    build changes: slide list and rels) and shares the masters, layouts,
+    theme and docProps parts with every other deck, copy-on-write style.
+    """
+    base = _bases.get((width, height))
+    if base is None:
+        base = Presentation()
+        base.slide_width = width
+        base.slide_height = height
+        _bases[(width, height)] = base
+    src = base.part
+    package = Package(None)
+    part = PresentationPart(src.partname, src.content_type, package, deepcopy(src._element))
+    _copy_rels(src.rels, part.rels, {})
+    _copy_rels(src.package._rels, package._rels, {src: part})
+    return part.presentation
+
+
+def render_slides(prs, slides, key=None):
+    """Render the display lists of one slide config; remember the finished slides
+    under `key` when they hold nothing but shapes."""
+    rendered = [render_slide(prs, items) for items in slides]
+    if key is not None and not adds_parts(slides):
+        remember(key, export_slides(rendered))
+    return rendered
+
+
+# ── EXPORTED SLIDES ──
+# A part leaves its package as (partname, content type, blob, rels) with rels
+# ((rId, reltype, external target or None, exported part or None), ...). The
+# slide layout rel keeps only its rId: it is re-pointed at the new package's.
+
+def _export(part):
+    rels = []
+    for rel in part.rels.values():
+        if rel.is_external:
+            rels.append((rel.rId, rel.reltype, rel.target_ref, None))
+        elif rel.reltype == RT.SLIDE_LAYOUT:
+            rels.append((rel.rId, rel.reltype, None, None))
+        else:
+            rels.append((rel.rId, rel.reltype, None, _export(rel.target_part)))
+    return (str(part.partname), part.content_type, part.blob, tuple(rels))
+
+
+def export_slides(slides):
+    """Picklable copies of rendered slides, with every part they relate to."""
+    return tuple(_export(slide.part) for slide in slides)
+
+
+def _import(package, exported, partname, layout_part):
+    """Add an exported part and what it relates to; partname None takes the
+    next free name in the part's series (chart3.xml -> chartN.xml)."""
+    name, content_type, blob, rels = exported
+    pictures = picture_key = None
+    if content_type.startswith("image/"):  # pictures are stored once per package
+        pictures = _spliced_pictures.setdefault(package, {})
+        picture_key = (content_type, hashlib.sha1(blob).digest())
+        if picture_key in pictures:
+            return pictures[picture_key]
+    if partname is None:
+        partname = package.next_partname(re.sub(r"\d*(\.\w+)$", r"%d\1", name))
+    part = Part(partname, content_type, package, blob)
+    part_rels = part.rels
+    for rId, reltype, ref, target in rels:
+        if ref is not None:
+            part_rels._rels[rId] = _Relationship(part_rels._base_uri, rId, reltype, RTM.EXTERNAL, ref)
+            continue
+        target = layout_part if target is None else _import(package, target, None, layout_part)
+        part_rels._rels[rId] = _Relationship(part_rels._base_uri, rId, reltype, RTM.INTERNAL, target)
+    if pictures is not None:
+        pictures[picture_key] = part
+    return part
+
+
+def splice_slides(prs, exported):
+    """Append exported slides to `prs`, in order, with new partnames, rIds and ids.
+
+    Spliced slides are plain parts, so they are written as is but can't be
+    opened through prs.slides afterwards.
+    """
+    pres_part = prs.part
+    sld_id_lst = prs.slides._sldIdLst
+    layout_part = prs.slide_layouts[6].part
+    for slide in exported:
+        partname = PackURI("/ppt/slides/slide%d.xml" % (len(sld_id_lst) + 1))
+        part = _import(pres_part.package, slide, partname, layout_part)
+        # Appending in order, so skip python-pptx's scans of every existing
+        # rel (relate_to) and slide id (add_sldId) for each new slide
+        rId = pres_part.rels._add_relationship(RT.SLIDE, part)
+        next_id = int(sld_id_lst[-1].get("id")) + 1 if len(sld_id_lst) else 256
+        sld_id_lst._add_sldId(id=next_id, rId=rId)
+
+
+def remember(key, exported):
+    """Cache one slide config's exported slides under `key`."""
+    _part_cache[key] = exported
+    if len(_part_cache) > PART_CACHE_SIZE:
+        _part_cache.popitem(last=False)
+
+
+def splice_cached(prs, key):
+    """Append the slides cached under `key` to `prs`; False on a miss."""
+    exported = _part_cache.get(key)
+    if exported is None:
+        return False
+    _part_cache.move_to_end(key)
+    splice_slides(prs, exported)
+    return True
+
+
+def write_deck(slides, width, height, output_path):
+    """Render a list of slide display lists into a new .pptx at output_path."""
+    prs = new_deck(width, height)
+    for items in slides:
+        render_slide(prs, items)
+    prs.save(output_path)
+    return output_path
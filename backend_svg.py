@@ -0,0 +1,230 @@
+"""
+SVG backend for display lists (display.py): a live preview of a slide
+without building a .pptx or running LibreOffice.
+
+Each primitive becomes an SVG element in a viewBox measured in points. Text
+is broken into lines with the same font metrics the engine fits text with
+(textfit.py), so a preview wraps where PowerPoint will, give or take kerning.
+Charts drawn from data are plotted as plain bars, lines or a pie; an original
+chart copied from the source deck shows as a labelled placeholder, and an
+original picture is embedded from the source zip.
+"""
+
+import math
+import base64
+import zipfile
+from functools import lru_cache
+from xml.sax.saxutils import escape, quoteattr
+
+from passthrough import _source_package
+from textfit import EMU_PER_PT, LINE_HEIGHT, wrap
+
+# Text box insets in points (0.1in left/right, 0.05in top/bottom)
+INSET_X = 7.2
+INSET_Y = 3.6
+ASCENT = 0.8  # baseline of a line, as a fraction of its height from the top
+ROUNDING = 0.05  # roundRect corner radius, as a fraction of the shorter side (stamping.py)
+CHART_COLORS = ("4472C4", "ED7D31", "A5A5A5", "FFC000", "5B9BD5", "70AD47")
+GENERIC_FONTS = "Calibri, Carlito, sans-serif"
+ANCHOR = {"left": "start", "center": "middle", "right": "end"}
+
+
+def _pt(emu):
+    return round(emu / EMU_PER_PT, 2)
+
+
+def _family(font):
+    return font if GENERIC_FONTS.startswith(font + ",") else "%s, %s" % (font, GENERIC_FONTS)
+
+
+def _box(p):
+    return _pt(p.x), _pt(p.y), _pt(p.w), _pt(p.h)
+
+
+# ── TEXT ──
+
+def _text_block(p, runs, bold, italic, align, valign, spacing):
+    """<text> for runs wrapped to the box, one <tspan> per line."""
+    x, y, w, h = _box(p)
+    lines = wrap(runs, p.font, p.size, p.w)
+    line_h = spacing or p.size * LINE_HEIGHT
+    block = line_h * len(lines)
+    if valign == "middle":
+        top = y + (h - block) / 2
+    elif valign == "bottom":
+        top = y + h - INSET_Y - block
+    else:
+        top = y + INSET_Y
+    if align == "center":
+        tx = x + w / 2
+    elif align == "right":
+        tx = x + w - INSET_X
+    else:
+        tx = x + INSET_X
+
+    attrs = 'font-family=%s font-size="%s" fill="#%s" text-anchor="%s"' % (
+        quoteattr(_family(p.font)), p.size, p.color, ANCHOR[align])
+    if bold:
+        attrs += ' font-weight="bold"'
+    if italic:
+        attrs += ' font-style="italic"'
+    out = ["<text %s xml:space=\"preserve\">" % attrs]
+    for i, line in enumerate(lines):
+        baseline = round(top + line_h * (i + ASCENT), 2)
+        spans = "".join(
+            '<tspan font-weight="bold">%s</tspan>' % escape(text) if b and not bold else escape(text)
+            for text, b in line)
+        out.append('<tspan x="%s" y="%s">%s</tspan>' % (round(tx, 2), baseline, spans))
+    out.append("</text>")
+    return "".join(out)
+
+
+# ── CHARTS ──
+
+def _bars(x, y, w, h, categories, series):
+    peak = max([v for _, values in series for v in values if v is not None] + [0]) or 1
+    n_cat = max(len(values) for _, values in series)
+    group = w / n_cat
+    bar = group * 0.7 / len(series)
+    out = []
+    for s, (_, values) in enumerate(series):
+        for i, v in enumerate(values):
+            if not v or v < 0:
+                continue
+            bh = h * v / peak
+            out.append('<rect x="%.2f" y="%.2f" width="%.2f" height="%.2f" fill="#%s"/>' % (
+                x + group * i + group * 0.15 + bar * s, y + h - bh, bar, bh,
+                CHART_COLORS[s % len(CHART_COLORS)]))
+    return out
+
+
+def _lines(x, y, w, h, categories, series):
+    peak = max([v for _, values in series for v in values if v is not None] + [0]) or 1
+    out = []
+    for s, (_, values) in enumerate(series):
+        step = w / max(len(values) - 1, 1)
+        points = " ".join("%.2f,%.2f" % (x + step * i, y + h - h * (v or 0) / peak)
+                          for i, v in enumerate(values))
+        out.append('<polyline points="%s" fill="none" stroke="#%s" stroke-width="2"/>' % (
+            points, CHART_COLORS[s % len(CHART_COLORS)]))
+    return out
+
+
+def _pie(x, y, w, h, categories, series):
+    values = [max(v or 0, 0) for v in series[0][1]] if series else []
+    total = sum(values)
+    if not total:
+        return []
+    r = min(w, h) / 2
+    cx, cy = x + w / 2, y + h / 2
+    out, angle = [], -math.pi / 2
+    for i, v in enumerate(values):
+        sweep = 2 * math.pi * v / total
+        color = CHART_COLORS[i % len(CHART_COLORS)]
+        if sweep >= 2 * math.pi - 1e-9:
+            out.append('<circle cx="%.2f" cy="%.2f" r="%.2f" fill="#%s"/>' % (cx, cy, r, color))
+            break
+        x0, y0 = cx + r * math.cos(angle), cy + r * math.sin(angle)
+        angle += sweep
+        x1, y1 = cx + r * math.cos(angle), cy + r * math.sin(angle)
+        out.append('<path d="M%.2f,%.2f L%.2f,%.2f A%.2f,%.2f 0 %d 1 %.2f,%.2f Z" fill="#%s"/>' % (
+            cx, cy, x0, y0, r, r, int(sweep > math.pi), x1, y1, color))
+    return out
+
+
+_PLOTS = {"bar": _bars, "line": _lines, "pie": _pie}
+
+
+# ── PRIMITIVES ──
+
+def _background(p):
+    return '<rect width="100%%" height="100%%" fill="#%s"/>' % p.color
+
+
+def _shape(p):
+    x, y, w, h = _box(p)
+    if p.op == "oval":
+        return '<ellipse cx="%s" cy="%s" rx="%s" ry="%s" fill="#%s"/>' % (
+            round(x + w / 2, 2), round(y + h / 2, 2), round(w / 2, 2), round(h / 2, 2), p.fill)
+    rx = ' rx="%s"' % round(min(w, h) * ROUNDING, 2) if p.op == "rounded" else ""
+    return '<rect x="%s" y="%s" width="%s" height="%s"%s fill="#%s"/>' % (x, y, w, h, rx, p.fill)
+
+
+def _text(p):
+    return _text_block(p, ((p.text, p.bold),), p.bold, p.italic, p.align, p.valign, p.spacing)
+
+
+def _runs(p):
+    return _text_block(p, p.runs, False, False, "left", "middle", p.spacing)
+
+
+@lru_cache(maxsize=64)
+def _data_uri(source, stamp, partname):
+    """The picture part as a data: URI, or None if it can't be read."""
+    try:
+        content_type = _source_package(source, stamp).content_type(partname)
+        with zipfile.ZipFile(source) as zf:
+            blob = zf.read(partname.lstrip("/"))
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return None
+    return "data:%s;base64,%s" % (content_type, base64.b64encode(blob).decode("ascii"))
+
+
+def _placeholder(p, label):
+    x, y, w, h = _box(p)
+    return ('<rect x="%s" y="%s" width="%s" height="%s" fill="#F2F2F2" stroke="#BFBFBF" '
+            'stroke-dasharray="4 3"/><text x="%s" y="%s" font-family="%s" font-size="12" '
+            'fill="#7F7F7F" text-anchor="middle">%s</text>') % (
+        x, y, w, h, round(x + w / 2, 2), round(y + h / 2 + 4, 2), GENERIC_FONTS, escape(label))
+
+
+def _picture(p):
+    uri = _data_uri(p.source, p.stamp, p.partname)
+    if uri is None:
+        return _placeholder(p, "Picture")
+    # Fitted inside the box and centered, as passthrough.add_picture places it
+    src_w, src_h = p.src_w or p.w, p.src_h or p.h
+    scale = min(p.w / src_w, p.h / src_h)
+    cx, cy = src_w * scale, src_h * scale
+    return '<image x="%s" y="%s" width="%s" height="%s" href="%s"/>' % (
+        _pt(p.x + (p.w - cx) / 2), _pt(p.y + (p.h - cy) / 2), _pt(cx), _pt(cy), uri)
+
+
+def _chart_ref(p):
+    return _placeholder(p, "Original chart")
+
+
+def _chart(p):
+    x, y, w, h = _box(p)
+    if not p.series or not any(values for _, values in p.series):
+        return _placeholder(p, "Chart")
+    pad = min(w, h) * 0.08
+    x, y, w, h = x + pad, y + pad, w - 2 * pad, h - 2 * pad
+    out = ['<g>']
+    if p.chart_type != "pie":
+        out.append('<line x1="%.2f" y1="%.2f" x2="%.2f" y2="%.2f" stroke="#D9D9D9"/>' % (x, y + h, x + w, y + h))
+    out.extend(_PLOTS.get(p.chart_type, _bars)(x, y, w, h, p.categories, p.series))
+    out.append("</g>")
+    return "".join(out)
+
+
+OPS = {
+    "background": _background, "rect": _shape, "oval": _shape, "rounded": _shape,
+    "text": _text, "runs": _runs, "picture": _picture, "chart_ref": _chart_ref, "chart": _chart,
+}
+
+
+# ── SLIDES ──
+
+def render_slide(items, width, height):
+    """One slide's display list as an SVG document (width/height in EMU)."""
+    w, h = _pt(width), _pt(height)
+    body = "".join(OPS[p.op](p) for p in items)
+    return ('<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 %s %s" '
+            'preserveAspectRatio="xMidYMid meet"><rect width="100%%" height="100%%" fill="#FFFFFF"/>'
+            '%s</svg>') % (w, h, body)
+
+
+def render_slides(slides, width, height):
+    """SVG documents for a list of display lists."""
+    return [render_slide(items, width, height) for items in slides]
@@ -0,0 +1,128 @@
+"""
+Micro-benchmarks for the build pipeline.
+Run: python bench.py shapes [--slides N]
+
+shapes  Stamped prototypes (stamping.py) vs. the python-pptx add_shape /
+        add_textbox path they replaced: shapes per second, and a check that
+        both produce the same slide XML.
+"""
+
+import sys
+import time
+import argparse
+
+from pptx import Presentation
+from pptx.util import Inches, Pt, Emu
+from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
+from pptx.enum.shapes import MSO_SHAPE
+from pptx.oxml.ns import qn
+from lxml import etree
+
+import stamping
+import engine
+
+SLICK = engine.load_theme("slick")
+T = SLICK.ns
+
+
+# -- reference: the python-pptx helpers the templates used before stamping --
+
+def _ref_shape(slide, kind, x, y, w, h, fill_color):
+    shape = slide.shapes.add_shape(kind, x, y, w, h)
+    shape.fill.solid(); shape.fill.fore_color.rgb = fill_color
+    shape.line.fill.background()
+    if kind == MSO_SHAPE.ROUNDED_RECTANGLE:
+        pg = shape._element.find('.//' + qn('a:prstGeom'))
+        av = pg.find(qn('a:avLst'))
+        if av is None: av = etree.SubElement(pg, qn('a:avLst'))
+        for g in av.findall(qn('a:gd')): av.remove(g)
+        g = etree.SubElement(av, qn('a:gd')); g.set('name', 'adj'); g.set('fmla', 'val 5000')
+    return shape
+
+
+def _ref_text(slide, x, y, w, h, text, font_name, font_size, color, bold=False,
+              italic=False, align=PP_ALIGN.LEFT, valign=MSO_ANCHOR.TOP, line_spacing=None):
+    txBox = slide.shapes.add_textbox(x, y, w, h)
+    tf = txBox.text_frame; tf.word_wrap = True
+    p = tf.paragraphs[0]; p.text = text; p.font.name = font_name
+    p.font.size = Pt(font_size); p.font.color.rgb = color
+    p.font.bold = bold; p.font.italic = italic; p.alignment = align
+    if line_spacing: p.line_spacing = Pt(line_spacing)
+    bp = tf._txBody.find(qn('a:bodyPr'))
+    bp.set('anchor', {MSO_ANCHOR.TOP: 't', MSO_ANCHOR.MIDDLE: 'ctr', MSO_ANCHOR.BOTTOM: 'b'}.get(valign, 't'))
+    return txBox
+
+
+REFERENCE = {
+    "rect": lambda s, *a: _ref_shape(s, MSO_SHAPE.RECTANGLE, *a),
+    "rounded": lambda s, *a: _ref_shape(s, MSO_SHAPE.ROUNDED_RECTANGLE, *a),
+    "oval": lambda s, *a: _ref_shape(s, MSO_SHAPE.OVAL, *a),
+    "text": _ref_text,
+}
+
+STAMPED = {
+    "rect": lambda s, *a: stamping.stamp_shape(s, stamping.RECT, *a),
+    "rounded": lambda s, *a: stamping.stamp_shape(s, stamping.ROUNDED_RECT, *a),
+    "oval": lambda s, *a: stamping.stamp_shape(s, stamping.OVAL, *a),
+    "text": stamping.stamp_text,
+}
+
+
+def _in_brief_shapes(add, slide, bullets=5):
+    """The shape mix of an in_brief slide: 5 shapes per bullet plus title/accent."""
+    add["rect"](slide, 0, 0, T["ACC_W"], T["H"], T["GREEN"])
+    add["text"](slide, T["LM"], Inches(0.15), T["CW"], Inches(0.65), "In Brief",
+                SLICK.fonts["title"], 28, T["DARK"], True, False, PP_ALIGN.LEFT, MSO_ANCHOR.BOTTOM)
+    add["rect"](slide, T["LM"], Inches(0.85), Inches(2.5), Inches(0.04), T["GREEN"])
+    for i in range(bullets):
+        y = Emu(Inches(1.1) + i * Inches(0.85)); col = T["COLORS"][i % len(T["COLORS"])]
+        add["rounded"](slide, T["LM"], y, T["CW"], Inches(0.75), T["OFF_WHITE"])
+        add["rect"](slide, T["LM"], y, Inches(0.10), Inches(0.75), col)
+        add["oval"](slide, Emu(T["LM"] + Inches(0.22)), y, Inches(0.4), Inches(0.4), col)
+        add["text"](slide, Emu(T["LM"] + Inches(0.22)), y, Inches(0.4), Inches(0.4), str(i + 1),
+                    SLICK.fonts["title"], 14, T["WHITE"], True, False, PP_ALIGN.CENTER, MSO_ANCHOR.MIDDLE)
+        add["text"](slide, Emu(T["LM"] + Inches(0.8)), y, Inches(7.6), Inches(0.75),
+                    f"Bullet {i + 1}: something worth saying\nsecond line", SLICK.fonts["body"], 15,
+                    T["DARK"], False, False, PP_ALIGN.LEFT, MSO_ANCHOR.MIDDLE, 19)
+    return 3 + 5 * bullets
+
+
+def _run(add, slides):
+    prs = Presentation()
+    start = time.perf_counter()
+    shapes = 0
+    for _ in range(slides):
+        slide = prs.slides.add_slide(prs.slide_layouts[6])
+        shapes += _in_brief_shapes(add, slide)
+    elapsed = time.perf_counter() - start
+    return prs, shapes, elapsed
+
+
+def bench_shapes(slides):
+    ref_prs, shapes, ref_t = _run(REFERENCE, slides)
+    new_prs, _, new_t = _run(STAMPED, slides)
+
+    mismatches = sum(
+        1 for a, b in zip(ref_prs.slides, new_prs.slides)
+        if etree.tostring(a.shapes._spTree) != etree.tostring(b.shapes._spTree)
+    )
+    print(f"{slides} in_brief slides, {shapes} shapes")
+    print(f"  python-pptx: {shapes / ref_t:>10,.0f} shapes/s  ({ref_t * 1000:.1f} ms)")
+    print(f"  stamped:     {shapes / new_t:>10,.0f} shapes/s  ({new_t * 1000:.1f} ms)")
+    print(f"  speedup:     {ref_t / new_t:.1f}x")
+    print(f"  XML equivalent: {'yes' if not mismatches else f'NO ({mismatches} slides differ)'}")
+    return 0 if not mismatches else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deck Converter micro-benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+    p = sub.add_parser("shapes", help="stamped shape prototypes vs python-pptx")
+    p.add_argument("--slides", type=int, default=200)
+    args = parser.parse_args(argv)
+    if args.bench == "shapes":
+        return bench_shapes(args.slides)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Lazy chart reader: pulls series data out of a deck's chart parts on demand.
+Nothing here runs at upload time — extract_slides only notes each chart's
+part name, and map_slide calls read_chart for slides mapped to text_graph.
+"""
+
+import os
+import copy
+import zipfile
+from functools import lru_cache
+from lxml import etree
+
+C = "{http://schemas.openxmlformats.org/drawingml/2006/chart}"
+
+# plotArea child -> chartType understood by the template builders
+CHART_KINDS = {
+    "barChart": "bar", "bar3DChart": "bar",
+    "lineChart": "line", "line3DChart": "line",
+    "areaChart": "line", "area3DChart": "line",
+    "pieChart": "pie", "pie3DChart": "pie",
+    "doughnutChart": "pie", "ofPieChart": "pie",
+}
+
+
+def _cache_points(parent, as_number):
+    """Read the c:pt cache under a c:cat / c:val / c:tx element, in idx order."""
+    if parent is None:
+        return []
+    count = parent.find(".//" + C + "ptCount")
+    size = int(count.get("val")) if count is not None else 0
+    points = {}
+    for pt in parent.iter(C + "pt"):
+        v = pt.find(C + "v")
+        if v is None or v.text is None:
+            continue
+        idx = int(pt.get("idx", len(points)))
+        if as_number:
+            try:
+                points[idx] = float(v.text)
+            except ValueError:
+                points[idx] = None
+        else:
+            points[idx] = v.text
+        size = max(size, idx + 1)
+    return [points.get(i) for i in range(size)]
+
+
+def _read_series(ser, n):
+    """Turn one c:ser element into {"name", "labels", "values"}."""
+    name = _cache_points(ser.find(C + "tx"), as_number=False)
+    if not name:
+        v = ser.find(C + "tx/" + C + "v")
+        name = [v.text] if v is not None else []
+    labels = _cache_points(ser.find(C + "cat"), as_number=False)
+    values = _cache_points(ser.find(C + "val"), as_number=True)
+    if not labels:
+        labels = [str(i + 1) for i in range(len(values))]
+    return {
+        "name": (name[0] if name and name[0] else f"Series {n + 1}"),
+        "labels": ["" if label is None else label for label in labels],
+        "values": values,
+    }
+
+
+def _parse_chart(stream):
+    """Stream a chart part, keeping only the c:ser caches."""
+    kind = None
+    series = []
+    for event, el in etree.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if kind is None and el.tag.startswith(C):
+                kind = CHART_KINDS.get(el.tag[len(C):])
+            continue
+        if el.tag == C + "ser":
+            series.append(_read_series(el, len(series)))
+            el.clear()
+            while el.getprevious() is not None:
+                del el.getparent()[0]
+    return {"chartType": kind or "bar", "chartData": series}
+
+
+@lru_cache(maxsize=256)
+def _read_chart_cached(pptx_path, stamp, partname):
+    with zipfile.ZipFile(pptx_path) as zf:
+        with zf.open(partname.lstrip("/")) as stream:
+            return _parse_chart(stream)
+
+
+def read_chart(pptx_path, partname):
+    """Return {"chartType", "chartData"} for one chart part of a deck.
+    Results are cached per (file version, part); returns None if unreadable."""
+    try:
+        st = os.stat(pptx_path)
+        data = _read_chart_cached(pptx_path, (st.st_mtime_ns, st.st_size), partname)
+    except (OSError, KeyError, zipfile.BadZipFile, etree.XMLSyntaxError, ValueError):
+        return None
+    if not data["chartData"]:
+        return None
+    return copy.deepcopy(data)
@@ -0,0 +1,231 @@
+"""
+Detector regression runner — accuracy and speed over a labelled corpus.
+Run: python corpus.py path/to/corpus [--workers N] [--json report.json]
+
+A corpus is a directory of .pptx decks. Each deck needs ground truth, either
+in a sibling file (deck.pptx -> deck.json) or in a labels.json at the corpus
+root keyed by deck filename. Labels map slide numbers to slide types:
+
+    {"1": "title", "2": "agenda", "3": "in_brief"}
+
+A plain list (["title", "agenda", ...]) is read as slides 1..N. Slides
+without a label are analysed but left out of the accuracy figures.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from detector import analyze_deck, SLIDE_TYPES, RuleStats, format_rule_stats
+from metrics import percentile
+
+
+def _normalize_labels(raw):
+    """Turn a list or {number: type} dict into {int number: type}."""
+    if isinstance(raw, list):
+        return {i + 1: t for i, t in enumerate(raw) if t}
+    return {int(k): v for k, v in raw.items() if v}
+
+
+def load_corpus(corpus_dir):
+    """Return [(deck_path, {slide_number: true_type})] for every labelled deck."""
+    shared = {}
+    shared_path = os.path.join(corpus_dir, "labels.json")
+    if os.path.exists(shared_path):
+        with open(shared_path) as f:
+            shared = json.load(f)
+
+    decks = []
+    for name in sorted(os.listdir(corpus_dir)):
+        if not name.endswith(".pptx") or name.startswith("~$"):
+            continue
+        path = os.path.join(corpus_dir, name)
+        raw = shared.get(name)
+        if raw is None:
+            sidecar = os.path.splitext(path)[0] + ".json"
+            if not os.path.exists(sidecar):
+                continue
+            with open(sidecar) as f:
+                raw = json.load(f)
+        decks.append((path, _normalize_labels(raw)))
+    return decks
+
+
+def _run_deck(job):
+    """Analyze one deck and time it. Runs inside a worker process."""
+    path, with_rule_stats = job
+    rule_stats = RuleStats() if with_rule_stats else None
+    start = time.perf_counter()
+    try:
+        analysis = analyze_deck(path, rule_stats=rule_stats)
+    except Exception as e:
+        return {"path": path, "error": f"{type(e).__name__}: {e}"}
+    elapsed = time.perf_counter() - start
+    return {
+        "path": path,
+        "seconds": elapsed,
+        "extract_seconds": elapsed - sum(s["detect_seconds"] for s in analysis),
+        "rule_stats": rule_stats.to_dict() if rule_stats else None,
+        "slides": [{
+            "number": s["number"],
+            "detected_type": s["detected_type"],
+            "candidates": [c["type"] for c in s["candidates"]],
+            "seconds": s["detect_seconds"],
+        } for s in analysis],
+    }
+
+
+def evaluate(decks, workers=None, rule_stats=False):
+    """Run analyze_deck over the corpus in parallel and score it against the labels."""
+    labels = dict(decks)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        runs = list(pool.map(_run_deck, [(path, rule_stats) for path, _ in decks]))
+    corpus_rules = RuleStats() if rule_stats else None
+
+    confusion = {}  # true type -> {predicted type: count}
+    per_type = {}   # true type -> {"total", "top1", "top3"}
+    latencies = []  # seconds per slide, as timed by analyze_deck around its detection
+    extracts = []   # seconds per deck reading its slides, before any detection
+    errors = []
+
+    for run in runs:
+        if "error" in run:
+            errors.append({"deck": os.path.basename(run["path"]), "error": run["error"]})
+            continue
+        if corpus_rules is not None:
+            corpus_rules.merge(run["rule_stats"])
+        slides = run["slides"]
+        latencies.extend(s["seconds"] for s in slides)
+        extracts.append(run["extract_seconds"])
+        truth = labels[run["path"]]
+        for s in slides:
+            want = truth.get(s["number"])
+            if not want:
+                continue
+            got = s["detected_type"]
+            row = confusion.setdefault(want, {})
+            row[got] = row.get(got, 0) + 1
+            stats = per_type.setdefault(want, {"total": 0, "top1": 0, "top3": 0})
+            stats["total"] += 1
+            if got == want:
+                stats["top1"] += 1
+            if want in s["candidates"][:3]:
+                stats["top3"] += 1
+
+    total = sum(st["total"] for st in per_type.values())
+    latencies.sort()
+    extracts.sort()
+    return {
+        "decks": len(runs),
+        "slides": len(latencies),
+        "labelled_slides": total,
+        "errors": errors,
+        "top1": sum(st["top1"] for st in per_type.values()) / total if total else 0.0,
+        "top3": sum(st["top3"] for st in per_type.values()) / total if total else 0.0,
+        "per_type": {
+            t: {
+                "total": st["total"],
+                "top1": st["top1"] / st["total"],
+                "top3": st["top3"] / st["total"],
+            } for t, st in per_type.items()
+        },
+        "confusion": confusion,
+        "latency_ms": {
+            "p50": percentile(latencies, 50) * 1000,
+            "p95": percentile(latencies, 95) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+        },
+        "extract_ms": {
+            "p50": percentile(extracts, 50) * 1000,
+            "p95": percentile(extracts, 95) * 1000,
+            "p99": percentile(extracts, 99) * 1000,
+        },
+        "rule_stats": corpus_rules.report() if corpus_rules else None,
+    }
+
+
+def _type_order(report):
+    """Slide types in SLIDE_TYPES order, plus any unknown labels at the end."""
+    seen = set(report["confusion"])
+    for row in report["confusion"].values():
+        seen.update(row)
+    known = [t for t in SLIDE_TYPES if t in seen]
+    return known + sorted(seen - set(known))
+
+
+def format_report(report):
+    """Render the report as plain text for the terminal."""
+    lines = []
+    lines.append(f"Decks: {report['decks']}   Slides: {report['slides']}   "
+                 f"Labelled: {report['labelled_slides']}")
+    lines.append(f"Top-1: {report['top1']:.1%}   Top-3: {report['top3']:.1%}")
+    lat = report["latency_ms"]
+    lines.append(f"Detection per slide: p50 {lat['p50']:.2f} ms   "
+                 f"p95 {lat['p95']:.2f} ms   p99 {lat['p99']:.2f} ms")
+    ext = report["extract_ms"]
+    lines.append(f"Extraction per deck: p50 {ext['p50']:.2f} ms   "
+                 f"p95 {ext['p95']:.2f} ms   p99 {ext['p99']:.2f} ms")
+
+    lines.append("")
+    lines.append(f"{'type':<22}{'n':>5}{'top-1':>9}{'top-3':>9}")
+    for t in _type_order(report):
+        st = report["per_type"].get(t)
+        if st:
+            lines.append(f"{t:<22}{st['total']:>5}{st['top1']:>9.1%}{st['top3']:>9.1%}")
+
+    types = _type_order(report)
+    if types:
+        lines.append("")
+        lines.append("Confusion matrix (rows = truth, columns = detected)")
+        width = max(len(t) for t in types) + 2
+        lines.append(" " * width + "".join(f"{i:>4}" for i in range(len(types))))
+        for t in types:
+            row = report["confusion"].get(t, {})
+            lines.append(f"{t:<{width}}" + "".join(f"{row.get(p, 0) or '.':>4}" for p in types))
+        lines.append("")
+        lines.append("Columns: " + ", ".join(f"{i}={t}" for i, t in enumerate(types)))
+
+    if report.get("rule_stats"):
+        lines.append("")
+        lines.append(format_rule_stats(report["rule_stats"]))
+
+    for err in report["errors"]:
+        lines.append(f"ERROR {err['deck']}: {err['error']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score the detector against a labelled corpus.")
+    parser.add_argument("corpus", help="directory of .pptx decks with ground-truth labels")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--json", dest="json_out", help="also write the full report to this file")
+    parser.add_argument("--min-top1", type=float, default=None,
+                        help="exit non-zero if top-1 accuracy falls below this fraction")
+    parser.add_argument("--rule-stats", action="store_true",
+                        help="also report per-section detector hit counts and timings")
+    args = parser.parse_args(argv)
+
+    decks = load_corpus(args.corpus)
+    if not decks:
+        print(f"No labelled decks found in {args.corpus}")
+        return 1
+
+    report = evaluate(decks, workers=args.workers, rule_stats=args.rule_stats)
+    print(format_report(report))
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if report["errors"]:
+        return 1
+    if args.min_top1 is not None and report["top1"] < args.min_top1:
+        print(f"\nTop-1 accuracy {report['top1']:.1%} is below {args.min_top1:.1%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
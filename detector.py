@@ -7,6 +7,10 @@ and scores every template type to return ranked candidates.
 from pptx import Presentation
 from pptx.util import Inches, Pt, Emu
 import re
+import time
+import threading
+
+import metrics
 
 SLIDE_TYPES = [
     "title", "agenda", "in_brief", "section_divider", "stat_callout",
@@ -63,6 +67,102 @@ SLIDE_TYPE_DESCRIPTIONS = {
 }
 
 
+class RuleStats:
+    """Opt-in counters for the scoring sections in _score_all_types.
+
+    For each section (TITLE, CLOSER, ...) records how many slides it ran on,
+    how often it produced a non-zero score, the summed score and the time spent.
+    slides counts every slide scored, empty ones too; empty ones are skipped
+    before any section runs, so sections see slides - empty.
+    Detection only pays for this when a RuleStats is passed in.
+    """
+
+    def __init__(self):
+        self.slides = 0
+        self.empty = 0
+        self.sections = {}  # name -> {"calls", "fired", "score", "seconds"}
+        self._lock = threading.Lock()
+
+    def record(self, section, section_scores, started):
+        """Record one section's (type, score, reason) entries. Returns the new clock."""
+        now = time.perf_counter()
+        st = self.sections.get(section)
+        if st is None:
+            st = self.sections[section] = {"calls": 0, "fired": 0, "score": 0.0, "seconds": 0.0}
+        total = sum(sc for _, sc, _ in section_scores)
+        st["calls"] += 1
+        if total > 0:
+            st["fired"] += 1
+        st["score"] += total
+        st["seconds"] += now - started
+        return now
+
+    def to_dict(self):
+        """Raw counters, safe to pickle or send between processes."""
+        with self._lock:
+            return {"slides": self.slides, "empty": self.empty,
+                    "sections": {k: dict(v) for k, v in self.sections.items()}}
+
+    def merge(self, other):
+        """Fold another RuleStats (or its to_dict() form) into this one."""
+        data = other.to_dict() if isinstance(other, RuleStats) else other
+        with self._lock:
+            self.slides += data["slides"]
+            self.empty += data.get("empty", 0)
+            for name, src in data["sections"].items():
+                st = self.sections.setdefault(name, {"calls": 0, "fired": 0, "score": 0.0, "seconds": 0.0})
+                for k in st:
+                    st[k] += src[k]
+
+    def reset(self):
+        with self._lock:
+            self.slides = 0
+            self.empty = 0
+            self.sections = {}
+
+    def report(self):
+        """Per-section summary in scoring order, ready for JSON."""
+        data = self.to_dict()
+        rows = []
+        for name, st in data["sections"].items():
+            calls = st["calls"] or 1
+            rows.append({
+                "section": name,
+                "calls": st["calls"],
+                "fired": st["fired"],
+                "hit_rate": round(st["fired"] / calls, 3),
+                "avg_score": round(st["score"] / calls, 3),
+                "total_ms": round(st["seconds"] * 1000, 3),
+                "avg_us": round(st["seconds"] / calls * 1e6, 2),
+            })
+        return {"slides": data["slides"], "empty": data["empty"], "sections": rows}
+
+
+# Everything recorded by instrumented analyze_deck calls in this process
+PROCESS_RULE_STATS = RuleStats()
+
+
+def format_rule_stats(report):
+    """Render a RuleStats.report() as a plain-text table."""
+    lines = [f"Rule stats over {report['slides']} slides "
+             f"({report['empty']} empty, skipped before the sections run)",
+             f"{'section':<22}{'calls':>7}{'fired':>7}{'hit%':>7}{'avg score':>11}{'total ms':>10}{'avg us':>9}"]
+    for row in report["sections"]:
+        lines.append(f"{row['section']:<22}{row['calls']:>7}{row['fired']:>7}"
+                     f"{row['hit_rate']:>7.0%}{row['avg_score']:>11.3f}"
+                     f"{row['total_ms']:>10.2f}{row['avg_us']:>9.1f}")
+    return "\n".join(lines)
+
+
+def _part_ref(shape, part):
+    """Where a chart/picture part lives in the source package, plus its box on the slide."""
+    return {
+        "partname": str(part.partname),
+        "left": int(shape.left or 0), "top": int(shape.top or 0),
+        "width": int(shape.width or 0), "height": int(shape.height or 0),
+    }
+
+
 def extract_slides(pptx_path):
     """Extract text structure from each slide."""
     prs = Presentation(pptx_path)
@@ -71,16 +171,22 @@ def extract_slides(pptx_path):
         sd = {
             "index": i, "number": i + 1, "shapes": [], "all_text": [],
             "text_boxes": [], "has_chart": False, "has_table": False,
-            "has_image": False, "shape_count": 0,
+            "has_image": False, "shape_count": 0, "charts": [], "images": [],
+            "slide_width": prs.slide_width, "slide_height": prs.slide_height,
         }
         for shape in slide.shapes:
             sd["shape_count"] += 1
             if shape.has_chart:
                 sd["has_chart"] = True
+                # Only the part name — chart XML is read lazily by charts.read_chart
+                sd["charts"].append(_part_ref(shape, shape.chart_part))
             if shape.has_table:
                 sd["has_table"] = True
             if hasattr(shape, "image"):
                 sd["has_image"] = True
+                blip_rId = shape._element.blip_rId
+                if blip_rId:
+                    sd["images"].append(_part_ref(shape, shape.part.related_part(blip_rId)))
             if shape.has_text_frame:
                 paragraphs = [p.text.strip() for p in shape.text_frame.paragraphs if p.text.strip()]
                 if paragraphs:
@@ -109,7 +215,7 @@ def extract_slides(pptx_path):
                         "type": "text", "paragraphs": paragraphs,
                         "text": "\n".join(paragraphs), "para_count": len(paragraphs),
                         "max_font_size": max_font, "left": shape.left, "top": shape.top,
-                        "width": shape.width, "placeholder_idx": ph_idx,
+                        "width": shape.width, "height": shape.height, "placeholder_idx": ph_idx,
                     })
                     sd["all_text"].extend(paragraphs)
         sd["total_text"] = "\n".join(sd["all_text"])
@@ -119,8 +225,9 @@ def extract_slides(pptx_path):
     return slides
 
 
-def _score_all_types(slide):
-    """Score every slide type. Returns sorted list of (type, score, reason)."""
+def _score_all_types(slide, rule_stats=None):
+    """Score every slide type. Returns sorted list of (type, score, reason).
+    Pass a RuleStats to record per-section hits, scores and timings."""
     texts = slide["all_text"]
     boxes = slide["text_boxes"]
     total_words = slide["total_words"]
@@ -129,10 +236,16 @@ def _score_all_types(slide):
     max_font = max((b["max_font_size"] for b in boxes), default=0)
     bullet_like = [t for t in texts if len(t) > 15]
 
+    if rule_stats is not None:
+        rule_stats.slides += 1
     if not texts:
+        if rule_stats is not None:
+            rule_stats.empty += 1
         return [("skip", 0.5, "Empty slide")]
 
     scores = []
+    if rule_stats is not None:
+        clock = time.perf_counter()
 
     # ── TITLE ──
     s, r = 0.0, []
@@ -149,6 +262,7 @@ def _score_all_types(slide):
     if body_phs_t and sum(b["para_count"] for b in body_phs_t) >= 3:
         s -= 0.25; r.append("body has multiple items")
     scores.append(("title", max(min(s, 0.95), 0), "; ".join(r) or "no strong signals"))
+    if rule_stats is not None: clock = rule_stats.record("TITLE", scores[-1:], clock)
 
     # ── CLOSER ──
     s, r = 0.0, []
@@ -158,6 +272,7 @@ def _score_all_types(slide):
     if total_words < 30: s += 0.2; r.append("short text")
     if slide["number"] > 3: s += 0.1
     scores.append(("closer", min(s, 0.95), "; ".join(r) or "no closing keywords"))
+    if rule_stats is not None: clock = rule_stats.record("CLOSER", scores[-1:], clock)
 
     # ── SECTION DIVIDER ──
     s, r = 0.0, []
@@ -170,6 +285,7 @@ def _score_all_types(slide):
     if body_phs and sum(b["para_count"] for b in body_phs) >= 3:
         s -= 0.3; r.append("multiple body paragraphs")
     scores.append(("section_divider", max(min(s, 0.95), 0), "; ".join(r) or "no strong signals"))
+    if rule_stats is not None: clock = rule_stats.record("SECTION DIVIDER", scores[-1:], clock)
 
     # ── AGENDA ──
     s, r = 0.0, []
@@ -179,6 +295,7 @@ def _score_all_types(slide):
     bc = len([t for t in texts if len(t) > 8])
     if 3 <= bc <= 8 and total_words < 100: s += 0.2; r.append(f"{bc} items")
     scores.append(("agenda", min(s, 0.95), "; ".join(r) or "no agenda keywords"))
+    if rule_stats is not None: clock = rule_stats.record("AGENDA", scores[-1:], clock)
 
     # ── IN BRIEF ──
     s, r = 0.0, []
@@ -201,6 +318,7 @@ def _score_all_types(slide):
         if (lefts[-1] - lefts[0]) > Emu(3000000):
             s -= 0.3; r.append("body boxes side-by-side (comparison?)")
     scores.append(("in_brief", max(min(s, 0.95), 0), "; ".join(r) or "few bullet-length items"))
+    if rule_stats is not None: clock = rule_stats.record("IN BRIEF", scores[-1:], clock)
 
     # ── STAT CALLOUT ──
     s, r = 0.0, []
@@ -214,6 +332,7 @@ def _score_all_types(slide):
     if nums and s < 0.3: s += 0.3; r.append(f"numbers: {', '.join(nums[:3])}")
     if total_words < 30: s += 0.15
     scores.append(("stat_callout", min(s, 0.95), "; ".join(r) or "no big numbers"))
+    if rule_stats is not None: clock = rule_stats.record("STAT CALLOUT", scores[-1:], clock)
 
     # ── QUOTE ──
     s, r = 0.0, []
@@ -223,6 +342,7 @@ def _score_all_types(slide):
     if has_attr: s += 0.25; r.append("attribution pattern")
     if has_q and total_words < 80: s += 0.1
     scores.append(("quote", min(s, 0.95), "; ".join(r) or "no quoted text"))
+    if rule_stats is not None: clock = rule_stats.record("QUOTE", scores[-1:], clock)
 
     # ── OPEN QUESTIONS ──
     s, r = 0.0, []
@@ -231,6 +351,7 @@ def _score_all_types(slide):
     elif qm >= 2: s += 0.45; r.append(f"{qm} questions")
     elif qm == 1: s += 0.15; r.append("1 question")
     scores.append(("open_questions", min(s, 0.95), "; ".join(r) or "no questions"))
+    if rule_stats is not None: clock = rule_stats.record("OPEN QUESTIONS", scores[-1:], clock)
 
     # ── HYPOTHESES ──
     s, r = 0.0, []
@@ -241,6 +362,7 @@ def _score_all_types(slide):
     st_m = [w for w in st_words if w in full]
     if st_m: s += 0.25; r.append(f"status: {', '.join(st_m)}")
     scores.append(("hypotheses", min(s, 0.95), "; ".join(r) or "no hypothesis keywords"))
+    if rule_stats is not None: clock = rule_stats.record("HYPOTHESES", scores[-1:], clock)
 
     # ── WSN DENSE / REVEAL ──
     s, r = 0.0, []
@@ -250,6 +372,7 @@ def _score_all_types(slide):
     elif wc >= 2: s += 0.55; r.append(f"{wc}/3 WSN sections")
     scores.append(("wsn_dense", min(s, 0.95), "; ".join(r) or "no WSN structure"))
     scores.append(("wsn_reveal", min(s * 0.9, 0.95), ("; ".join(r) + " (3-slide build)") if r else "no WSN structure"))
+    if rule_stats is not None: clock = rule_stats.record("WSN DENSE / REVEAL", scores[-2:], clock)
 
     # ── COMPARISON ──
     s, r = 0.0, []
@@ -264,6 +387,7 @@ def _score_all_types(slide):
         if len(lefts) >= 2 and (lefts[-1] - lefts[0]) > Emu(3000000):
             s += 0.45; r.append("two-column body layout")
     scores.append(("comparison", min(s, 0.95), "; ".join(r) or "no comparison signals"))
+    if rule_stats is not None: clock = rule_stats.record("COMPARISON", scores[-1:], clock)
 
     # ── METHODS ──
     s, r = 0.0, []
@@ -274,6 +398,7 @@ def _score_all_types(slide):
     kv = sum(1 for t in texts if ":" in t and len(t) > 10)
     if kv >= 3: s += 0.2; r.append(f"{kv} key:value pairs")
     scores.append(("methods", min(s, 0.95), "; ".join(r) or "no methodology keywords"))
+    if rule_stats is not None: clock = rule_stats.record("METHODS", scores[-1:], clock)
 
     # ── FINDINGS & RECS ──
     s, r = 0.0, []
@@ -288,6 +413,7 @@ def _score_all_types(slide):
                    "; ".join(r) or "no finding/rec patterns"))
     scores.append(("findings_recs_dense", min(s * (1.1 if dense else 0.7), 0.95),
                    ("; ".join(r) + (f"; {bc2} items" if dense else "")) or "no finding/rec patterns"))
+    if rule_stats is not None: clock = rule_stats.record("FINDINGS & RECS", scores[-2:], clock)
 
     # ── PROCESS FLOW ──
     s, r = 0.0, []
@@ -297,6 +423,7 @@ def _score_all_types(slide):
     nd = re.findall(r'(?:^|\n)\s*\d+[\.\)]\s', slide["total_text"])
     if len(nd) >= 3: s += 0.3; r.append(f"{len(nd)} numbered items")
     scores.append(("process_flow", min(s, 0.95), "; ".join(r) or "no step patterns"))
+    if rule_stats is not None: clock = rule_stats.record("PROCESS FLOW", scores[-1:], clock)
 
     # ── MATRIX ──
     s, r = 0.0, []
@@ -304,38 +431,48 @@ def _score_all_types(slide):
     mm2 = [k for k in mx if k in full]
     if mm2: s += 0.55; r.append(f"keywords: {', '.join(mm2)}")
     scores.append(("matrix", min(s, 0.95), "; ".join(r) or "no matrix keywords"))
+    if rule_stats is not None: clock = rule_stats.record("MATRIX", scores[-1:], clock)
 
     # ── TEXT + GRAPH ──
     s, r = 0.0, []
     if slide["has_chart"]: s += 0.8; r.append("contains a chart")
     scores.append(("text_graph", min(s, 0.95), "; ".join(r) or "no chart"))
+    if rule_stats is not None: clock = rule_stats.record("TEXT + GRAPH", scores[-1:], clock)
 
     # ── PROGRESSIVE REVEAL ──
     s, r = 0.0, []
     if len(bullet_like) >= 3 and total_words > 80:
         s += 0.2; r.append("multi-point content")
     scores.append(("progressive_reveal", min(s, 0.95), "; ".join(r) or "better as single slide"))
+    if rule_stats is not None: clock = rule_stats.record("PROGRESSIVE REVEAL", scores[-1:], clock)
 
     scores.sort(key=lambda x: x[1], reverse=True)
     return scores
 
 
-def detect_slide_candidates(slide, top_n=3):
+def detect_slide_candidates(slide, top_n=3, rule_stats=None):
     """Return the top N candidates with scores and reasons."""
-    scores = _score_all_types(slide)
+    scores = _score_all_types(slide, rule_stats)
     meaningful = [(t, s, r) for t, s, r in scores if s > 0.05]
     if not meaningful:
         return [("in_brief", 0.3, "fallback")]
     return meaningful[:top_n]
 
 
-def analyze_deck(pptx_path):
-    """Full analysis: extract slides, detect types, return ranked candidates."""
-    slides = extract_slides(pptx_path)
+def analyze_deck(pptx_path, rule_stats=None):
+    """Full analysis: extract slides, detect types, return ranked candidates.
+    If a RuleStats is given it collects this deck's rule timings, which are
+    also folded into PROCESS_RULE_STATS."""
+    with metrics.timer("extract_slides_seconds"):
+        slides = extract_slides(pptx_path)
     results = []
     for slide in slides:
-        candidates = detect_slide_candidates(slide, top_n=3)
+        started = time.perf_counter()
+        candidates = detect_slide_candidates(slide, top_n=3, rule_stats=rule_stats)
         best_type, best_conf, best_reason = candidates[0]
+        seconds = time.perf_counter() - started
+        metrics.observe("score_types_seconds", seconds, slide_type=best_type)
+        metrics.inc("slides_analyzed_total", slide_type=best_type)
         preview = slide["total_text"][:120].replace("\n", " ")
         if len(slide["total_text"]) > 120:
             preview += "..."
@@ -356,5 +493,12 @@ def analyze_deck(pptx_path):
             "has_image": slide["has_image"],
             "all_text": slide["all_text"],
             "raw_boxes": slide["text_boxes"],
+            "charts": slide["charts"],
+            "images": slide["images"],
+            "slide_size": (slide["slide_width"], slide["slide_height"]),
+            "source_path": pptx_path,
+            "detect_seconds": seconds,
         })
+    if rule_stats is not None:
+        PROCESS_RULE_STATS.merge(rule_stats)
     return results
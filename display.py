@@ -0,0 +1,40 @@
+"""
+Display list: the drawing primitives the engine emits for each slide.
+
+Every primitive is a namedtuple whose first field names its op, with
+geometry in EMU, colours as hex strings and alignment as plain words. A slide
+is a tuple of primitives, so it hashes and compares by value — identical
+slides can be cached and reused across builds — and backends (backend_pptx,
+backend_svg) turn it into real output.
+"""
+
+import hashlib
+from collections import namedtuple
+
+# op: "background"
+Background = namedtuple("Background", "op color")
+# op: "rect" | "oval" | "rounded"
+Shape = namedtuple("Shape", "op x y w h fill")
+# op: "text" — one run; align left|center|right, valign top|middle|bottom, spacing in pt or None
+Text = namedtuple("Text", "op x y w h text font size color bold italic align valign spacing")
+# op: "runs" — left-aligned, vertically centred; runs is ((text, bold), ...)
+Runs = namedtuple("Runs", "op x y w h runs font size color spacing")
+# op: "picture" — a picture part of the source deck, fitted into the box
+Picture = namedtuple("Picture", "op x y w h source stamp partname src_w src_h")
+# op: "chart_ref" — a chart part of the source deck, copied as is
+ChartRef = namedtuple("ChartRef", "op x y w h source stamp partname")
+# op: "chart" — drawn from data; chart_type bar|line|pie, series is ((name, values), ...)
+Chart = namedtuple("Chart", "op x y w h chart_type categories series")
+
+# Primitives that add parts (and relationships) to the package, not just shapes
+PART_OPS = frozenset(("picture", "chart_ref", "chart"))
+
+
+def adds_parts(slides):
+    """True if any of these slides draws a primitive that adds parts."""
+    return any(p.op in PART_OPS for items in slides for p in items)
+
+
+def digest(slide):
+    """Stable content hash of one slide's display list (same across processes)."""
+    return hashlib.sha1(repr(slide).encode("utf-8")).hexdigest()
@@ -0,0 +1,579 @@
+"""
+Theme-driven slide rendering engine.
+
+Every template is a theme file in themes/: colours, fonts, metrics, shared
+components and one layout per slide type. A layout is a small tree of nodes
+(slide, let, each, use, rect/oval/rounded, text, lead_text, chart). Node
+values are plain data, never code:
+  - a number or boolean is itself; in a box ([x, y, w, h]) a number is inches
+  - a string names something: a theme colour, palette or metric, or a name
+    bound by let/each/use, with .field steps into dicts ("c.title"; a
+    missing field is None)
+  - a list is a length: the sum of its terms, numbers in inches and names
+    (prefixed "-" to subtract) in EMU, e.g. ["x", 0.15]
+  - {"lit": ...} is literal text, {"get": name, "or": literal} a name with a
+    default, {"not": value} a negation, and {"fn": name, ...} calls one of the
+    Python functions in theme_functions.py with the other keys as arguments
+
+load_theme() parses and compiles a theme once per process, checking names,
+functions and their arguments as it goes; anything that only depends on
+theme names is folded to a constant. Rendering a slide config evaluates what
+is left into display lists (display.py); backend_pptx turns those into the
+.pptx.
+"""
+
+import os
+import re
+import json
+import time
+import inspect
+import hashlib
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+from pptx.util import Inches, Emu
+from pptx.dml.color import RGBColor
+
+import backend_pptx
+import metrics
+from streaming import PackageStream
+from display import Background, Shape, Text, Runs, Picture, ChartRef, Chart, adds_parts
+from passthrough import source_stamp
+import textfit
+from theme_functions import FUNCTIONS
+
+THEMES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "themes")
+
+# Parallel builds: fewer configs to render than this aren't worth shipping to workers
+PARALLEL_MIN = 32
+_pool = None  # (workers, ProcessPoolExecutor), kept for the life of the process
+
+_SHAPES = ("rect", "oval", "rounded")
+_NODE_KINDS = ("slide", "let", "each", "use", "rect", "oval", "rounded", "text", "lead_text", "chart")
+_NAME = re.compile(r"[A-Za-z_]\w*(\.\w+)*$")
+
+
+class _Dyn:
+    """A value that depends on the slide being rendered: get(scope)."""
+    __slots__ = ("get",)
+
+    def __init__(self, get):
+        self.get = get
+
+
+def _ev(value, scope):
+    return value.get(scope) if type(value) is _Dyn else value
+
+
+def _path(value, keys):
+    for key in keys:
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+# ── TEXT AND CHART HELPERS ──
+
+def _find_split(text):
+    """Find where to split text into bold lead-in + regular continuation."""
+    for delim in [' — ', ' – ']:
+        idx = text.find(delim)
+        if idx > 0: return text[:idx + len(delim)], text[idx + len(delim):]
+    idx = text.find(': ')
+    if idx > 0: return text[:idx + 1], text[idx + 2:]
+    words = text.split(); char_count = 0
+    for i, w in enumerate(words):
+        char_count += len(w) + 1
+        if i >= 3:
+            ci = text.find(',', char_count - 1)
+            if ci > 0 and ci < len(text) * 0.55: return text[:ci + 1], text[ci + 2:]
+    if len(words) > 10:
+        n = min(8, len(words) // 2)
+        pos = sum(len(words[i]) + 1 for i in range(n))
+        return text[:pos].rstrip(), text[pos:]
+    return text, ""
+
+
+def _lead_runs(text):
+    """Runs for text with a bold lead-in clause."""
+    bold_part, rest_part = _find_split(text)
+    if not rest_part:
+        return ((bold_part, True),)
+    return ((bold_part + " ", True), (rest_part, False))
+
+
+def _chart_primitive(c, x, y, w, h):
+    """The slide's original chart (or else picture) if its part can be copied,
+    otherwise a chart drawn from chartData. Returns (primitive, drawn_from_data)."""
+    ref = c.get("chartRef")
+    stamp = source_stamp(ref)
+    if stamp:
+        return ChartRef("chart_ref", x, y, w, h, ref["source"], stamp, ref["partname"]), False
+    ref = c.get("imageRef")
+    stamp = source_stamp(ref)
+    if stamp:
+        return Picture("picture", x, y, w, h, ref["source"], stamp, ref["partname"],
+                       ref.get("width"), ref.get("height")), False
+
+    chart_data_raw = c.get("chartData", [{"name": "S1", "labels": ["A", "B", "C"], "values": [25, 45, 30]}])
+    categories, series = None, ()
+    if chart_data_raw:
+        categories = tuple(chart_data_raw[0].get("labels", ["A", "B", "C"]))
+        # Pie charts only show one series
+        raw = chart_data_raw[:1] if c.get("chartType") == "pie" else chart_data_raw
+        series = tuple((cd.get("name", "Series 1"), tuple(cd.get("values", [25, 45, 30]))) for cd in raw)
+    chart_type = c.get("chartType", "bar")
+    if chart_type not in backend_pptx.CHART_TYPES:
+        chart_type = "bar"
+    return Chart("chart", x, y, w, h, chart_type, categories, series), True
+
+
+# ── NODES ──
+# Each compiled node is (when, run, data); run(theme, canvas, data, scope).
+
+class _Canvas:
+    """Collects the display lists of the slides a layout draws."""
+    __slots__ = ("slides", "items")
+
+    def __init__(self):
+        self.slides = []
+        self.items = None
+
+
+def _box(box, scope):
+    return [int(_ev(v, scope)) for v in box]
+
+
+def _run_slide(theme, canvas, data, scope):
+    background, block = data
+    canvas.items = []
+    canvas.slides.append(canvas.items)
+    if background is not None:
+        canvas.items.append(Background("background", str(_ev(background, scope))))
+    theme.run(block, canvas, dict(scope))
+
+
+def _run_let(theme, canvas, data, scope):
+    for name, value in data:
+        scope[name] = _ev(value, scope)
+
+
+def _run_each(theme, canvas, data, scope):
+    items, limit, names, block = data
+    items = _ev(items, scope) or ()
+    if limit is not None:
+        items = items[:_ev(limit, scope)]
+    name, index, number, last = names
+    for i, item in enumerate(items):
+        inner = dict(scope)
+        inner[name] = item
+        if index:
+            inner[index] = i
+        if number:
+            inner[number] = i + 1
+        if last:
+            inner[last] = i == len(items) - 1
+        theme.run(block, canvas, inner)
+
+
+def _run_use(theme, canvas, data, scope):
+    name, args = data
+    inner = dict(scope)
+    for arg, value in args:
+        inner[arg] = _ev(value, scope)
+    theme.run(theme.components[name], canvas, inner)
+
+
+def _run_shape(theme, canvas, data, scope):
+    op, box, fill = data
+    x, y, w, h = _box(box, scope)
+    canvas.items.append(Shape(op, x, y, w, h, str(_ev(fill, scope))))
+
+
+def _fit(runs, font, w, h, size, spacing, fit, scope):
+    """(size, spacing) shrunk until the runs fit the box, for nodes with "fit"."""
+    if fit is None:
+        return size, spacing
+    fitted = textfit.fit_size(runs, font, w, h, size, _ev(fit, scope), spacing)
+    if fitted == size:
+        return size, spacing
+    return fitted, spacing and round(spacing * fitted / size, 1)
+
+
+def _text(value):
+    return "" if value is None else str(value)
+
+
+def _run_text(theme, canvas, data, scope):
+    box, value, font, size, color, bold, italic, align, valign, spacing, fit = data
+    x, y, w, h = _box(box, scope)
+    text, bold = _text(_ev(value, scope)), bool(_ev(bold, scope))
+    size, spacing = _fit(((text, bold),), font, w, h, _ev(size, scope), _ev(spacing, scope), fit, scope)
+    canvas.items.append(Text(
+        "text", x, y, w, h, text, font, size, str(_ev(color, scope)), bold,
+        bool(_ev(italic, scope)), align, valign, spacing))
+
+
+def _run_lead_text(theme, canvas, data, scope):
+    box, value, font, size, color, spacing, fit = data
+    x, y, w, h = _box(box, scope)
+    runs = _lead_runs(_text(_ev(value, scope)))
+    size, spacing = _fit(runs, font, w, h, _ev(size, scope), _ev(spacing, scope), fit, scope)
+    canvas.items.append(Runs("runs", x, y, w, h, runs, font, size, str(_ev(color, scope)), spacing))
+
+
+def _run_chart(theme, canvas, data, scope):
+    box, synthesized = data
+    x, y, w, h = _box(box, scope)
+    primitive, from_data = _chart_primitive(scope["c"], x, y, w, h)
+    canvas.items.append(primitive)
+    if from_data:
+        theme.run(synthesized, canvas, scope)
+
+
+# ── THEMES ──
+
+class Theme:
+    """A compiled theme: names, components and one layout per slide type."""
+
+    def __init__(self, key, spec):
+        self.key = key
+        self.name = spec.get("name", key)
+        self.width, self.height = Inches(spec["size"][0]), Inches(spec["size"][1])
+        self.fonts = spec["fonts"]
+        self.families = set(self.fonts.values())  # and any font a text node names
+
+        ns = {"W": self.width, "H": self.height}
+        for name, hex_value in spec["colors"].items():
+            ns[name] = RGBColor.from_string(hex_value)
+        for name, colors in spec.get("palettes", {}).items():
+            ns[name] = [ns[col] for col in colors]
+        for name, table in spec.get("tables", {}).items():
+            ns[name] = {k: ns[col] for k, col in table.items()}
+        for name, inches in spec.get("metrics", {}).items():
+            ns[name] = Inches(inches)
+        self.ns = ns
+
+        # Components first, so a use can check its arguments against the params
+        specs = spec.get("components", {})
+        self._params = {name: tuple(comp.get("params", ())) for name, comp in specs.items()}
+        self.components = {name: self._block(comp["do"], f"components.{name}",
+                                             {"c", *self._params[name]})
+                           for name, comp in specs.items()}
+        self.layouts = {name: self._block(nodes, f"layouts.{name}", {"c"})
+                        for name, nodes in spec["layouts"].items()}
+        self.builders = {name: self._builder(name) for name in self.layouts}
+
+    def _builder(self, slide_type):
+        """builder(prs, c) that draws straight into a Presentation."""
+        def build(prs, c):
+            for items in self.render(slide_type, c):
+                backend_pptx.render_slide(prs, items)
+        return build
+
+    def render(self, slide_type, c):
+        """Display lists (one tuple of primitives per slide) for one slide config."""
+        block = self.layouts.get(slide_type)
+        if block is None:
+            return []
+        with metrics.timer("template_render_seconds", template=self.key, slide_type=slide_type):
+            canvas = _Canvas()
+            self.run(block, canvas, {"c": c})
+            return [tuple(items) for items in canvas.slides]
+
+    def run(self, block, canvas, scope):
+        for when, run, data in block:
+            if when is not None and not _ev(when, scope):
+                continue
+            run(self, canvas, data, scope)
+
+    # -- compilation --
+    # `where` is the node's place in the theme file, for errors; `names` are
+    # the names bound where it is (let/each/use), which take precedence over
+    # the theme's.
+
+    def _error(self, where, message):
+        return ValueError(f"theme {self.key}, {where}: {message}")
+
+    def _name(self, value, where, names):
+        """A name, folded to a constant if it is one of the theme's."""
+        if not isinstance(value, str) or not _NAME.match(value):
+            raise self._error(where, f"not a name: {value!r} (literal text is {{\"lit\": ...}})")
+        first, *keys = value.split(".")
+        if first in names:
+            if not keys:
+                return _Dyn(lambda scope: scope[first])
+            return _Dyn(lambda scope: _path(scope[first], keys))
+        if first in self.ns:
+            return _path(self.ns[first], keys)
+        raise self._error(where, f"unknown name '{first}'")
+
+    def _length(self, terms, where, names):
+        """[term, ...]: numbers are inches, names EMU ("-name" subtracts)."""
+        parts = []
+        for term in terms:
+            if isinstance(term, (int, float)) and not isinstance(term, bool):
+                parts.append((1, Inches(term)))
+            elif isinstance(term, str):
+                sign = -1 if term.startswith("-") else 1
+                parts.append((sign, self._name(term.lstrip("-"), where, names)))
+            else:
+                raise self._error(where, f"bad length term {term!r}")
+        if not any(type(v) is _Dyn for _, v in parts):
+            return Emu(sum(sign * v for sign, v in parts))
+        return _Dyn(lambda scope: Emu(sum(sign * _ev(v, scope) for sign, v in parts)))
+
+    def _value(self, value, where, names, inches=False):
+        """Compile one spec value (see the module docstring); numbers are
+        inches if `inches`. Returns a constant or a _Dyn."""
+        if value is None or isinstance(value, bool):
+            return value
+        if isinstance(value, (int, float)):
+            return Inches(value) if inches else value
+        if isinstance(value, str):
+            return self._name(value, where, names)
+        if isinstance(value, list):
+            return self._length(value, where, names)
+        if not isinstance(value, dict):
+            raise self._error(where, f"bad value {value!r}")
+        if "lit" in value:
+            return value["lit"]
+        if "get" in value:
+            got, default = self._name(value["get"], where, names), value.get("or")
+            if type(got) is not _Dyn:
+                return default if got is None else got
+            return _Dyn(lambda scope: default if (v := got.get(scope)) is None else v)
+        if "not" in value:
+            inner = self._value(value["not"], where, names)
+            if type(inner) is not _Dyn:
+                return not inner
+            return _Dyn(lambda scope: not inner.get(scope))
+        if "fn" in value:
+            return self._call(value, where, names)
+        raise self._error(where, f"bad value {value!r}")
+
+    def _call(self, value, where, names):
+        func = FUNCTIONS.get(value["fn"])
+        if func is None:
+            raise self._error(where, f"unknown function '{value['fn']}'")
+        args = {k: self._value(v, f"{where}.{k}", names) for k, v in value.items() if k != "fn"}
+        try:
+            inspect.signature(func).bind(**args)
+        except TypeError as e:
+            raise self._error(where, f"{func.__name__}(): {e}") from None
+        if not any(type(v) is _Dyn for v in args.values()):
+            return func(**args)
+        items = list(args.items())
+        return _Dyn(lambda scope: func(**{k: _ev(v, scope) for k, v in items}))
+
+    def _bind(self, name, where, names):
+        if not isinstance(name, str) or not _NAME.match(name) or "." in name:
+            raise self._error(where, f"can't bind {name!r}")
+        if name in self.ns:
+            raise self._error(where, f"'{name}' shadows a theme name")
+        names.add(name)
+        return name
+
+    def _block(self, nodes, where, names):
+        if isinstance(nodes, dict):
+            nodes = [nodes]
+        names = set(names)  # names a node binds are seen by the nodes after it
+        return [self._node(node, f"{where}[{i}]", names) for i, node in enumerate(nodes)]
+
+    def _node(self, node, where, names):
+        kind = next((k for k in _NODE_KINDS if k in node), None)
+        if kind is None:
+            raise self._error(where, f"node without a kind: {node}")
+        where = f"{where}.{kind}"
+        when = self._value(node["when"], where + ".when", names) if "when" in node else None
+        value = node[kind]
+
+        if kind == "slide":
+            bg = self._value(node["background"], where, names) if "background" in node else None
+            return when, _run_slide, (bg, self._block(value, where, names))
+        if kind == "let":
+            lets = []
+            for k, v in value.items():  # in order: each one can use the ones before
+                v = self._value(v, f"{where}.{k}", names)
+                lets.append((self._bind(k, where, names), v))
+            return when, _run_let, lets
+        if kind == "each":
+            items = self._value(value, where, names)
+            limit = self._value(node["limit"], where + ".limit", names) if "limit" in node else None
+            inner = set(names)
+            bound = tuple(node.get(k) and self._bind(node[k], where, inner)
+                          for k in ("index", "number", "last"))
+            bound = (self._bind(node.get("as", "item"), where, inner),) + bound
+            return when, _run_each, (items, limit, bound, self._block(node["do"], where + ".do", inner))
+        if kind == "use":
+            if value not in self._params:
+                raise self._error(where, f"unknown component '{value}'")
+            args = node.get("with", {})
+            unknown = set(args) - set(self._params[value])
+            if unknown:
+                raise self._error(where, f"{value} has no param(s) {', '.join(sorted(unknown))}")
+            return when, _run_use, (value, [(k, self._value(v, f"{where}.{k}", names))
+                                            for k, v in args.items()])
+
+        if not isinstance(value, list) or len(value) != 4:
+            raise self._error(where, "needs a box [x, y, w, h]")
+        box = [self._value(v, where, names, inches=True) for v in value]
+        if kind in _SHAPES:
+            return when, _run_shape, (kind, box, self._value(node["fill"], where + ".fill", names))
+        if kind == "chart":
+            return when, _run_chart, (box, self._block(node.get("synthesized", []), where, names))
+
+        def field(key, default=None):
+            return self._value(node.get(key, default), f"{where}.{key}", names)
+
+        font = node.get("font", "body")
+        font = self.fonts.get(font, font)
+        self.families.add(font)
+        align, valign = node.get("align", "left"), node.get("valign", "top")
+        if align not in backend_pptx.ALIGN or valign not in backend_pptx.VALIGN:
+            raise self._error(where, "bad align/valign")
+        if kind == "lead_text":
+            return when, _run_lead_text, (box, field("value"), font, field("size", 12),
+                                          field("color", "DARK"), field("spacing"), field("fit"))
+        return when, _run_text, (
+            box, field("value"), font, field("size", 12), field("color", "DARK"),
+            field("bold", False), field("italic", False), align, valign, field("spacing"), field("fit"))
+
+
+@lru_cache(maxsize=None)
+def theme_names():
+    """Themes shipped in themes/, by file name."""
+    return tuple(sorted(os.path.splitext(f)[0] for f in os.listdir(THEMES_DIR) if f.endswith(".json")))
+
+
+@lru_cache(maxsize=None)
+def load_theme(key):
+    """Parse and compile themes/<key>.json. Compiled once per process."""
+    if key not in theme_names():
+        raise KeyError(f"unknown theme: {key}")
+    with open(os.path.join(THEMES_DIR, key + ".json"), encoding="utf-8") as f:
+        return Theme(key, json.load(f))
+
+
+def warm():
+    """Compile every theme and load the metrics of the fonts they use, so the
+    first slide a process renders doesn't wait for the font folders to be
+    indexed."""
+    for key in theme_names():
+        textfit.warm(load_theme(key).families)
+
+
+# ── DECKS ──
+
+def render_deck(theme, slide_configs):
+    """Display lists for a whole deck, in order, from (slide_type, data_dict) tuples."""
+    slides = []
+    for slide_type, data in slide_configs:
+        slides.extend(theme.render(slide_type, data))
+    return slides
+
+
+def config_digest(c):
+    """Stable content hash of one mapped slide config."""
+    blob = json.dumps(c, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+# ── PARALLEL RENDERING ──
+
+def _render_chunk(theme_key, chunk):
+    """Worker: exported slides of a run of (slide_type, data) configs, each with
+    whether it may be cached (shapes only), and the metrics they recorded."""
+    theme = load_theme(theme_key)
+    prs = backend_pptx.new_deck(theme.width, theme.height)
+    out = []
+    for slide_type, data in chunk:
+        slides = theme.render(slide_type, data)
+        rendered = backend_pptx.render_slides(prs, slides)
+        out.append((backend_pptx.export_slides(rendered), not adds_parts(slides)))
+    return out, metrics.drain()
+
+
+def _worker_pool(workers):
+    global _pool
+    if _pool is None or _pool[0] != workers:
+        if _pool is not None:
+            _pool[1].shutdown(wait=False)
+        _pool = (workers, ProcessPoolExecutor(max_workers=workers, initializer=metrics.reset))
+    return _pool[1]
+
+
+def _render_parallel(theme, slide_configs, todo, workers):
+    """Render the configs at indices `todo` in worker processes; yields
+    (exported, cacheable) per index, in order, as chunks complete."""
+    pool = _worker_pool(workers)
+    size = -(-len(todo) // (workers * 4))  # a few chunks per worker evens out slow slides
+    chunks = [todo[i:i + size] for i in range(0, len(todo), size)]
+    futures = [pool.submit(_render_chunk, theme.key, [slide_configs[i] for i in chunk])
+               for chunk in chunks]
+    for future in futures:
+        out, recorded = future.result()
+        metrics.merge(recorded)
+        yield from out
+
+
+# ── BUILD ──
+
+def build_deck(theme, slide_configs, output_path, stream=False, compresslevel=None, workers=None,
+               digests=None):
+    """Build a complete deck from a list of (slide_type, data_dict) tuples.
+
+    Slides are keyed by (theme, slide type, config digest): a config seen in
+    an earlier build is spliced in from backend_pptx's part cache, so a
+    rebuild only renders the slides whose type or content changed. Callers
+    that keep configs between builds can pass their config_digest()s as
+    `digests` so unchanged configs aren't hashed again.
+
+    With stream=True each slide is written to the zip as soon as it is built
+    (streaming.py) instead of all at the end; compresslevel (0-9, None for
+    zlib's default) trades build speed against file size. With workers > 1
+    the configs to render are split into chunks rendered in that many
+    processes and merged back in order.
+    """
+    started = time.perf_counter()
+    if isinstance(theme, str):
+        theme = load_theme(theme)
+    prs = backend_pptx.new_deck(theme.width, theme.height)
+    out = None
+    if stream or compresslevel is not None:
+        out = PackageStream(prs, output_path, compresslevel)
+    if digests is None:
+        digests = [config_digest(data) for _, data in slide_configs]
+    keys = [(theme.key, slide_type, digest) for (slide_type, _), digest in zip(slide_configs, digests)]
+
+    todo = []
+    if workers and workers > 1:
+        todo = [i for i, key in enumerate(keys) if key not in backend_pptx._part_cache]
+    parallel = None
+    if len(todo) >= PARALLEL_MIN:
+        parallel = _render_parallel(theme, slide_configs, todo, workers)
+        todo = set(todo)
+
+    hits = 0
+    for i, (slide_type, data) in enumerate(slide_configs):
+        if parallel is not None and i in todo:
+            exported, cacheable = next(parallel)
+            backend_pptx.splice_slides(prs, exported)
+            if cacheable:
+                backend_pptx.remember(keys[i], exported)
+        elif backend_pptx.splice_cached(prs, keys[i]):
+            hits += 1
+        else:
+            backend_pptx.render_slides(prs, theme.render(slide_type, data), keys[i])
+        metrics.inc("slides_built_total", template=theme.key, slide_type=slide_type)
+        if stream:
+            out.flush()
+    with metrics.timer("deck_save_seconds", template=theme.key):
+        if out is not None:
+            out.close()
+        else:
+            prs.save(output_path)
+    metrics.inc("cache_hits_total", hits, cache="slide_parts", template=theme.key)
+    metrics.inc("cache_misses_total", len(slide_configs) - hits, cache="slide_parts", template=theme.key)
+    metrics.inc("decks_built_total", template=theme.key)
+    metrics.observe("build_seconds", time.perf_counter() - started, template=theme.key)
+    return output_path
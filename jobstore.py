@@ -0,0 +1,166 @@
+"""
+Job state for the web app: each upload's analysis, build revision and
+thumbnail status, kept under a job id so that any worker process can serve
+any request of the job.
+
+MemoryStore keeps jobs in this process (the development server, or one
+worker). SQLiteStore keeps them in a SQLite file that every worker on the
+host opens, with values pickled. Both keep only the `max_jobs` most recent
+jobs; create() returns the ids it dropped so their files can be removed.
+open_store() picks one from a URL: None or "memory", or "sqlite:///path".
+"""
+
+import os
+import uuid
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+MAX_JOBS = 100
+
+
+def new_id():
+    """A fresh job id (hex, safe in paths and URLs)."""
+    return uuid.uuid4().hex
+
+
+def valid_id(job_id):
+    return isinstance(job_id, str) and len(job_id) == 32 and all(c in "0123456789abcdef" for c in job_id)
+
+
+class MemoryStore:
+    """Jobs in a dict of this process."""
+
+    def __init__(self, max_jobs=MAX_JOBS):
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, job_id, fields):
+        """Add a job with its initial fields; returns the ids of jobs dropped to make room."""
+        with self._lock:
+            self._jobs[job_id] = dict(fields)
+            dropped = []
+            while len(self._jobs) > self.max_jobs:
+                dropped.append(self._jobs.popitem(last=False)[0])
+            return dropped
+
+    def exists(self, job_id):
+        with self._lock:
+            return job_id in self._jobs
+
+    def latest(self):
+        """Id of the most recent job, or None."""
+        with self._lock:
+            return next(reversed(self._jobs), None)
+
+    def get(self, job_id, name, default=None):
+        with self._lock:
+            return self._jobs.get(job_id, {}).get(name, default)
+
+    def set(self, job_id, name, value):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id][name] = value
+
+    def update(self, job_id, name, func, default=None):
+        """Replace a field with func(current value) atomically; returns the new
+        value (None if there is no such job). func must not mutate its argument."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            value = job[name] = func(job.get(name, default))
+            return value
+
+
+class SQLiteStore:
+    """Jobs in a SQLite database shared by the processes on one host."""
+
+    def __init__(self, path, max_jobs=MAX_JOBS):
+        self.path = path
+        self.max_jobs = max_jobs
+        self._local = threading.local()
+        with self._transaction() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS jobs "
+                       "(seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT UNIQUE NOT NULL)")
+            db.execute("CREATE TABLE IF NOT EXISTS fields "
+                       "(job TEXT NOT NULL, name TEXT NOT NULL, value BLOB, PRIMARY KEY (job, name))")
+
+    def _db(self):
+        # One connection per thread, and new ones after a fork
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            local.db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            local.db.execute("PRAGMA journal_mode=WAL")
+            local.db.execute("PRAGMA synchronous=NORMAL")
+            local.pid = os.getpid()
+        return local.db
+
+    @contextmanager
+    def _transaction(self):
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")  # takes the write lock now, so read-modify-write is atomic
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def create(self, job_id, fields):
+        """Add a job with its initial fields; returns the ids of jobs dropped to make room."""
+        with self._transaction() as db:
+            db.execute("INSERT INTO jobs (id) VALUES (?)", (job_id,))
+            db.executemany("INSERT INTO fields VALUES (?, ?, ?)",
+                           [(job_id, name, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+                            for name, value in fields.items()])
+            dropped = [row[0] for row in db.execute(
+                "SELECT id FROM jobs ORDER BY seq DESC LIMIT -1 OFFSET ?", (self.max_jobs,))]
+            for old in dropped:
+                db.execute("DELETE FROM fields WHERE job = ?", (old,))
+                db.execute("DELETE FROM jobs WHERE id = ?", (old,))
+            return dropped
+
+    def exists(self, job_id):
+        return self._db().execute("SELECT 1 FROM jobs WHERE id = ?", (job_id,)).fetchone() is not None
+
+    def latest(self):
+        """Id of the most recent job, or None."""
+        row = self._db().execute("SELECT id FROM jobs ORDER BY seq DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def get(self, job_id, name, default=None):
+        row = self._db().execute("SELECT value FROM fields WHERE job = ? AND name = ?",
+                                 (job_id, name)).fetchone()
+        return pickle.loads(row[0]) if row else default
+
+    def set(self, job_id, name, value):
+        with self._transaction() as db:
+            if db.execute("SELECT 1 FROM jobs WHERE id = ?", (job_id,)).fetchone():
+                db.execute("INSERT OR REPLACE INTO fields VALUES (?, ?, ?)",
+                           (job_id, name, pickle.dumps(value, pickle.HIGHEST_PROTOCOL)))
+
+    def update(self, job_id, name, func, default=None):
+        """Replace a field with func(current value) atomically; returns the new
+        value (None if there is no such job)."""
+        with self._transaction() as db:
+            if not db.execute("SELECT 1 FROM jobs WHERE id = ?", (job_id,)).fetchone():
+                return None
+            row = db.execute("SELECT value FROM fields WHERE job = ? AND name = ?",
+                             (job_id, name)).fetchone()
+            value = func(pickle.loads(row[0]) if row else default)
+            db.execute("INSERT OR REPLACE INTO fields VALUES (?, ?, ?)",
+                       (job_id, name, pickle.dumps(value, pickle.HIGHEST_PROTOCOL)))
+            return value
+
+
+def open_store(url=None, max_jobs=MAX_JOBS):
+    """MemoryStore for None or "memory", SQLiteStore for "sqlite:///path/to/jobs.db"."""
+    if not url or url == "memory":
+        return MemoryStore(max_jobs)
+    if url.startswith("sqlite:///"):
+        return SQLiteStore(url[len("sqlite:///"):], max_jobs)
+    raise ValueError("Unknown job store: %s" % url)
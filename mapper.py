@@ -5,6 +5,9 @@ the structured dicts that template builders expect.
 
 import re
 
+import metrics
+from charts import read_chart
+
 
 def _first_title(slide):
     """Get the most likely title from a slide's text boxes.
@@ -170,8 +173,36 @@ def _split_columns(slide):
     return left or [""], right or [""]
 
 
+def _source_chart(slide):
+    """Series data of the slide's first readable chart, or None."""
+    path = slide.get("source_path")
+    if not path:
+        return None
+    for ref in slide.get("charts", []):
+        chart = read_chart(path, ref["partname"])
+        if chart:
+            return chart
+    return None
+
+
+def _source_ref(slide, kind):
+    """Reference to the first chart/image part in the source deck, or None."""
+    path = slide.get("source_path")
+    refs = slide.get(kind, [])
+    if not path or not refs:
+        return None
+    ref = refs[0]
+    return {"source": path, "partname": ref["partname"],
+            "width": ref.get("width", 0), "height": ref.get("height", 0)}
+
+
 def map_slide(slide, slide_type):
     """Map extracted slide data to the template-ready dict for a given type."""
+    with metrics.timer("map_slide_seconds", slide_type=slide_type):
+        return _map_slide(slide, slide_type)
+
+
+def _map_slide(slide, slide_type):
     title = _first_title(slide)
     body = _body_texts(slide)
     texts = slide.get("all_text", [])
@@ -252,16 +283,35 @@ def map_slide(slide, slide_type):
         }
 
     elif slide_type == "text_graph":
-        # Can't extract chart data from python-pptx easily,
-        # so we pass the text and a placeholder chart
-        return {
-            "title": title,
-            "text": body,
-            "chartType": "bar",
-            "chartData": [{"name": "Series 1", "labels": ["A", "B", "C"], "values": [30, 50, 40]}],
-            "chartColors": ["E5E5E5", "3880F3", "368727"],
-            "note": "(Chart data from original not transferred — update manually)",
-        }
+        # Chart parts are only parsed here, for slides that end up as text_graph
+        chart = _source_chart(slide)
+        if chart:
+            out = {
+                "title": title,
+                "text": body,
+                "chartType": chart["chartType"],
+                "chartData": chart["chartData"],
+                "chartColors": ["E5E5E5", "3880F3", "368727"],
+            }
+        else:
+            # No readable chart in the original, so pass a placeholder chart
+            out = {
+                "title": title,
+                "text": body,
+                "chartType": "bar",
+                "chartData": [{"name": "Series 1", "labels": ["A", "B", "C"], "values": [30, 50, 40]}],
+                "chartColors": ["E5E5E5", "3880F3", "368727"],
+                "note": "(Chart data from original not transferred — update manually)",
+            }
+        # Original parts the builders can carry over as-is (see passthrough.py);
+        # the only layouts with a visual slot, so other types drop them
+        chart_ref = _source_ref(slide, "charts")
+        image_ref = _source_ref(slide, "images")
+        if chart_ref:
+            out["chartRef"] = chart_ref
+        elif image_ref:
+            out["imageRef"] = image_ref
+        return out
 
     elif slide_type == "process_flow":
         steps = []
@@ -388,3 +438,19 @@ def map_slide(slide, slide_type):
 
     # Fallback
     return {"title": title, "bullets": body}
+
+
+def premap_candidates(analysis, cache, top_n=3, cancel=None):
+    """Map every slide to each of its top-N candidate types ahead of time.
+
+    Fills cache[(slide number, slide type)] with map_slide results so a later
+    build only has to look them up. Meant to run on a background thread right
+    after analysis; set the `cancel` event to stop early (e.g. when its job is dropped).
+    """
+    for slide in analysis:
+        for cand in slide.get("candidates", [])[:top_n]:
+            if cancel is not None and cancel.is_set():
+                return
+            key = (slide["number"], cand["type"])
+            if cand["type"] != "skip" and key not in cache:
+                cache[key] = map_slide(slide, cand["type"])
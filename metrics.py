@@ -0,0 +1,222 @@
+"""
+Prometheus metrics for the web app: latency histograms per pipeline stage,
+counters, and gauges, served as text by /metrics (no prometheus_client
+needed).
+
+Stages record into this process's registry with timer(), observe() and
+inc(). Work done in other processes comes back to the web server:
+  - sandbox workers send what a job recorded along with its result
+  - engine render workers return it with each chunk
+Both use drain() on their side and merge() on the server's. Processes that
+are forked from one with recorded values call reset() first, so nothing is
+counted twice. With several server processes (serve.py), each one dumps its
+registry into a shared directory every DUMP_INTERVAL seconds, and /metrics
+adds the dumps up with collect().
+"""
+
+import os
+import math
+import time
+import glob
+import pickle
+import bisect
+import threading
+from contextlib import contextmanager
+
+PREFIX = "deckconv_"
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+           1, 2.5, 5, 10, 30, 60, 120)
+DUMP_INTERVAL = 1  # seconds between a server process's dumps to the shared directory
+
+# name: (type, help); labels are given where a metric is recorded
+METRICS = {
+    "upload_save_seconds": ("histogram", "Saving an uploaded deck to disk"),
+    "extract_slides_seconds": ("histogram", "extract_slides, per deck"),
+    "score_types_seconds": ("histogram", "_score_all_types per slide, by detected slide type"),
+    "map_slide_seconds": ("histogram", "map_slide per slide, by slide type"),
+    "template_render_seconds": ("histogram", "Theme layout of one slide, by template and slide type"),
+    "deck_save_seconds": ("histogram", "prs.save of a built deck (the last parts, when streaming), by template"),
+    "build_seconds": ("histogram", "build_deck, by template"),
+    "soffice_seconds": ("histogram", "LibreOffice converting a deck to PDF"),
+    "pdftoppm_seconds": ("histogram", "pdftoppm rendering a PDF's pages to JPEGs"),
+    "slides_analyzed_total": ("counter", "Slides analyzed, by detected slide type"),
+    "slides_built_total": ("counter", "Slides built, by template and slide type"),
+    "decks_built_total": ("counter", "Decks built, by template"),
+    "cache_hits_total": ("counter", "Cache hits, by cache (and template)"),
+    "cache_misses_total": ("counter", "Cache misses, by cache (and template)"),
+    "errors_total": ("counter", "Failed and rejected work, by stage and kind"),
+    "jobs_in_flight": ("gauge", "Admitted work running now, by gate"),
+    "queue_depth": ("gauge", "Work waiting for admission, by gate"),
+    "workers_busy": ("gauge", "Conversion worker processes running a job"),
+}
+
+_lock = threading.Lock()
+_counters = {}  # (name, labels) -> value
+_histograms = {}  # (name, labels) -> [count per bucket, ..., count over the last, sum]
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, seconds, **labels):
+    key = _key(name, labels)
+    i = bisect.bisect_left(BUCKETS, seconds)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+        hist[i] += 1
+        hist[-1] += seconds
+
+
+@contextmanager
+def timer(name, **labels):
+    """with timer("map_slide_seconds", slide_type=t): ... observes the block's wall time."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started, **labels)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list (0.0 if it is empty),
+    for exact figures from raw samples where a histogram is too coarse."""
+    if not values:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(values)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+# ── ACROSS PROCESSES ──
+
+def snapshot():
+    """Counters and histograms recorded so far, as plain data that pickles."""
+    with _lock:
+        return {"counters": dict(_counters),
+                "histograms": {k: list(v) for k, v in _histograms.items()}}
+
+
+def drain():
+    """snapshot(), then start from zero: for handing values to another process."""
+    with _lock:
+        snap = {"counters": dict(_counters), "histograms": dict(_histograms)}
+        _counters.clear()
+        _histograms.clear()
+        return snap
+
+
+def reset():
+    drain()
+
+
+def _add(into, snap):
+    for key, value in snap["counters"].items():
+        into["counters"][key] = into["counters"].get(key, 0) + value
+    for key, values in snap["histograms"].items():
+        hist = into["histograms"].get(key)
+        if hist is None:
+            into["histograms"][key] = list(values)
+        else:
+            for i, value in enumerate(values):
+                hist[i] += value
+    for key, value in snap.get("gauges", {}).items():
+        into["gauges"][key] = into["gauges"].get(key, 0) + value
+
+
+def merge(snap):
+    """Add another process's drain() into this registry."""
+    if not snap:
+        return
+    with _lock:
+        _add({"counters": _counters, "histograms": _histograms, "gauges": {}}, snap)
+
+
+def dump(directory, gauges=None):
+    """Write this process's snapshot (and its current gauges) to directory/<pid>.metrics."""
+    snap = snapshot()
+    snap["gauges"] = gauges or {}
+    path = os.path.join(directory, "%d.metrics" % os.getpid())
+    with open(path + ".tmp", "wb") as f:
+        pickle.dump(snap, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(path + ".tmp", path)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def collect(directory, gauges=None):
+    """This process's values plus every other process's last dump in directory.
+    Counters of processes that have exited still count; their gauges don't."""
+    total = {"counters": {}, "histograms": {}, "gauges": {}}
+    own = snapshot()
+    own["gauges"] = gauges or {}
+    _add(total, own)
+    for path in glob.glob(os.path.join(directory, "*.metrics")):
+        pid = int(os.path.basename(path).split(".")[0])
+        if pid == os.getpid():
+            continue
+        try:
+            with open(path, "rb") as f:
+                snap = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            continue
+        if not _alive(pid):
+            snap["gauges"] = {}
+        _add(total, snap)
+    return total
+
+
+# ── EXPOSITION ──
+
+def _labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{%s}" % ",".join('%s="%s"' % (k, str(v).replace("\\", r"\\").replace('"', r'\"')
+                                          .replace("\n", r"\n")) for k, v in pairs)
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(snap):
+    """Prometheus text exposition of a collect()/snapshot() result with gauges."""
+    by_name = {}
+    for kind in ("counters", "histograms", "gauges"):
+        for (name, labels), value in snap.get(kind, {}).items():
+            by_name.setdefault(name, []).append((labels, value))
+    out = []
+    for name, (kind, help_text) in METRICS.items():
+        series = by_name.get(name)
+        if not series:
+            continue
+        full = PREFIX + name
+        out.append("# HELP %s %s" % (full, help_text))
+        out.append("# TYPE %s %s" % (full, kind))
+        for labels, value in sorted(series):
+            if kind != "histogram":
+                out.append("%s%s %s" % (full, _labels(labels), _number(value)))
+                continue
+            running = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), value):
+                running += count
+                out.append("%s_bucket%s %d" % (full, _labels(labels, (("le", bound),)), running))
+            out.append("%s_sum%s %s" % (full, _labels(labels), _number(value[-1])))
+            out.append("%s_count%s %d" % (full, _labels(labels), running))
+    return "\n".join(out) + "\n"
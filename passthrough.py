@@ -0,0 +1,207 @@
+"""
+Zero-copy passthrough of chart and picture parts from the uploaded deck.
+
+Blobs are copied byte-for-byte from the source zip into the output package
+and their relationships are rewired with the original rIds, so nothing is
+decoded or re-encoded. Parts are deduplicated by content hash per output
+package, so a logo used on 40 slides is stored once. Charts are copied per
+placement instead: PowerPoint expects each chart (and its embedded workbook)
+to belong to a single graphic frame.
+
+Only Text + Graph has a slot for a visual in the themes, so it is the only
+slide type whose mapped config carries a chartRef/imageRef (and then just
+the slide's first chart, or else its first picture). Slides converted to
+any other type keep their text and lose their charts and pictures.
+"""
+
+import os
+import re
+import hashlib
+import weakref
+import zipfile
+from functools import lru_cache
+from lxml import etree
+
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT, RELATIONSHIP_TARGET_MODE as RTM
+from pptx.opc.package import Part, _Relationship
+from pptx.opc.packuri import PackURI
+from pptx.parts.image import ImagePart
+from pptx.oxml.shapes.graphfrm import CT_GraphicalObjectFrame
+
+CT_NS = "{http://schemas.openxmlformats.org/package/2006/content-types}"
+REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# output package -> {"hash": {key: Part}, "source": {(path, stamp, partname): Part}}
+_registries = weakref.WeakKeyDictionary()
+
+
+class _SourcePackage:
+    """Content types and relationships of a source .pptx, read straight from the zip."""
+
+    def __init__(self, path):
+        self.path = path
+        self.overrides = {}
+        self.defaults = {}
+        self._rels = {}
+        with zipfile.ZipFile(path) as zf:
+            self.names = set(zf.namelist())
+            types = etree.fromstring(zf.read("[Content_Types].xml"))
+        for el in types:
+            if el.tag == CT_NS + "Override":
+                self.overrides[el.get("PartName").lower()] = el.get("ContentType")
+            elif el.tag == CT_NS + "Default":
+                self.defaults[el.get("Extension").lower()] = el.get("ContentType")
+
+    def content_type(self, partname):
+        ct = self.overrides.get(partname.lower())
+        if ct is None:
+            ct = self.defaults.get(partname.rsplit(".", 1)[-1].lower(), "application/octet-stream")
+        return ct
+
+    def rels(self, zf, partname):
+        """[(rId, reltype, target partname or URL, is_external)] for one part."""
+        if partname not in self._rels:
+            uri = PackURI(partname)
+            member = uri.rels_uri.membername
+            rels = []
+            if member in self.names:
+                for rel in etree.fromstring(zf.read(member)):
+                    if rel.tag != REL_NS + "Relationship":
+                        continue
+                    external = rel.get("TargetMode") == RTM.EXTERNAL
+                    target = rel.get("Target")
+                    if not external:
+                        target = str(PackURI.from_rel_ref(uri.baseURI, target))
+                    rels.append((rel.get("Id"), rel.get("Type"), target, external))
+            self._rels[partname] = rels
+        return self._rels[partname]
+
+
+@lru_cache(maxsize=16)
+def _source_package(path, stamp):
+    return _SourcePackage(path)
+
+
+def _partname_template(partname):
+    """/ppt/media/image12.png -> /ppt/media/image%d.png"""
+    return re.sub(r"\d*(\.[^./]+)$", r"%d\1", partname.replace("%", "%%"))
+
+
+class _Copier:
+    """Copies one part and everything it relates to into an output package."""
+
+    def __init__(self, package, src, stamp, zf, share=True):
+        self.package = package
+        self.src = src
+        self.stamp = stamp
+        self.zf = zf
+        self.share = share
+        self.registry = _registries.setdefault(package, {"hash": {}, "source": {}})
+        self.used = None  # partnames in the output package, collected on first allocation
+
+    def _allocate(self, partname):
+        if self.used is None:
+            self.used = {str(p.partname) for p in self.package.iter_parts()}
+        tmpl = _partname_template(partname)
+        n = 1
+        while tmpl % n in self.used:
+            n += 1
+        self.used.add(tmpl % n)
+        return PackURI(tmpl % n)
+
+    def copy(self, partname, seen=()):
+        """Return the output Part for `partname`, reusing an identical one if present."""
+        src_key = (self.src.path, self.stamp, partname)
+        part = self.registry["source"].get(src_key) if self.share else None
+        if part is not None:
+            return part
+
+        blob = self.zf.read(partname.lstrip("/"))
+        content_type = self.src.content_type(partname)
+        rels = []
+        digest = hashlib.sha1(blob)
+        digest.update(content_type.encode())
+        for rId, reltype, target, external in self.src.rels(self.zf, partname):
+            if external:
+                rels.append((rId, reltype, target, True))
+                digest.update(f"{rId}|{reltype}|{target}".encode())
+            elif target not in seen and target.lstrip("/") in self.src.names:
+                child = self.copy(target, seen + (partname,))
+                rels.append((rId, reltype, child, False))
+                digest.update(f"{rId}|{reltype}|{child.partname}".encode())
+        key = digest.hexdigest()
+
+        part = self.registry["hash"].get(key) if self.share else None
+        if part is None:
+            new_name = self._allocate(partname)
+            cls = ImagePart if content_type.startswith("image/") else Part
+            part = cls(new_name, content_type, self.package, blob)
+            for rId, reltype, target, external in rels:
+                part.rels._rels[rId] = _Relationship(
+                    new_name.baseURI, rId, reltype,
+                    RTM.EXTERNAL if external else RTM.INTERNAL, target)
+            if self.share:
+                self.registry["hash"][key] = part
+        if self.share:
+            self.registry["source"][src_key] = part
+        return part
+
+
+def _copy_part(slide, ref, share=True):
+    """Copy the referenced source part (and its dependencies) into the slide's package."""
+    path = ref.get("source")
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        src = _source_package(path, stamp)
+        with zipfile.ZipFile(path) as zf:
+            return _Copier(slide.part.package, src, stamp, zf, share).copy(ref["partname"])
+    except (OSError, KeyError, zipfile.BadZipFile, etree.XMLSyntaxError):
+        return None
+
+
+def add_chart(slide, ref, x, y, w, h):
+    """Place the original chart part in the given box. Returns the graphicFrame or None."""
+    part = _copy_part(slide, ref, share=False)
+    if part is None:
+        return None
+    rId = slide.part.relate_to(part, RT.CHART)
+    shapes = slide.shapes
+    shape_id = shapes._next_shape_id
+    frame = CT_GraphicalObjectFrame.new_chart_graphicFrame(
+        shape_id, "Chart %d" % (shape_id - 1), rId, x, y, w, h)
+    shapes._spTree.append(frame)
+    return frame
+
+
+def add_picture(slide, ref, x, y, w, h):
+    """Place the original picture, scaled to fit inside the box and centered.
+    Returns the pic element or None."""
+    part = _copy_part(slide, ref)
+    if part is None:
+        return None
+    rId = slide.part.relate_to(part, RT.IMAGE)
+    src_w, src_h = ref.get("width") or w, ref.get("height") or h
+    scale = min(w / src_w, h / src_h)
+    cx, cy = int(src_w * scale), int(src_h * scale)
+    shapes = slide.shapes
+    shape_id = shapes._next_shape_id
+    return shapes._spTree.add_pic(shape_id, "Picture %d" % (shape_id - 1), "",
+                                  rId, x + (w - cx) // 2, y + (h - cy) // 2, cx, cy)
+
+
+def source_stamp(ref):
+    """(mtime_ns, size) of the ref's source deck if its part can be copied, else None."""
+    path = ref.get("source") if ref else None
+    if not path:
+        return None
+    try:
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        if ref["partname"].lstrip("/") in _source_package(path, stamp).names:
+            return stamp
+    except (OSError, KeyError, zipfile.BadZipFile, etree.XMLSyntaxError):
+        pass
+    return None
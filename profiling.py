@@ -0,0 +1,189 @@
+"""
+On-demand profiling of single requests.
+
+A profiled request runs under cProfile (deterministic: calls and times per
+function, saved as pstats) and, alongside it, a sampler thread that records
+the request thread's stack every SAMPLE_INTERVAL seconds (saved as collapsed
+stacks: one "outer;...;inner count" line per distinct stack, the input of
+flamegraph.pl and speedscope). Work the request hands to a sandbox worker
+is profiled in the worker the same way (profiled()) and merged in, under a
+"[conversion worker]" root frame in the stacks.
+
+Each profile is saved under its job id as <name>.prof, <name>.collapsed and
+a <name>.json summary with the slowest functions by own time, which is what
+the listing endpoint reads. Built-in waits (a request thread polling for its
+worker's result, lock acquires, sleeps) are left out of that list; they are
+still in the .prof.
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import uuid
+import pstats
+import cProfile
+import threading
+from collections import Counter
+
+SAMPLE_INTERVAL = 0.005
+TOP_FUNCTIONS = 15
+WORKER_ROOT = "[conversion worker]"
+WAITS = ("poll", "select", "acquire", "sleep", "wait")  # built-ins left out of the slowest list
+
+
+def _frame_name(code):
+    return "%s (%s:%d)" % (code.co_name, os.path.basename(code.co_filename), code.co_firstlineno)
+
+
+def _function_name(key):
+    filename, line, name = key
+    if filename == "~":  # built-in
+        return name
+    return "%s (%s:%d)" % (name, os.path.basename(filename), line)
+
+
+class Sampler:
+    """Counts the stacks of one thread, sampled from a background thread."""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+class _Raw:
+    """A cProfile stats dict in the shape pstats.Stats() reads."""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class Profile:
+    """cProfile plus a Sampler, for the thread that starts it."""
+
+    def __init__(self):
+        self._profiler = cProfile.Profile()
+        self._sampler = Sampler(threading.get_ident())
+        self._extra = []  # (stats, stacks, root) from other processes
+        self.started = self.seconds = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._sampler.start()
+        self._profiler.enable()
+
+    def stop(self):
+        self._profiler.disable()
+        self._sampler.stop()
+        self.seconds = time.perf_counter() - self.started
+
+    def add(self, data, root=WORKER_ROOT):
+        """Merge a profiled() result's profile from another process."""
+        self._extra.append((data["stats"], data["stacks"], root))
+
+    def data(self):
+        """{"stats": cProfile stats dict, "stacks": {collapsed stack: samples}} (pickles)."""
+        self._profiler.create_stats()
+        return {"stats": self._profiler.stats, "stacks": dict(self._sampler.counts)}
+
+    def save(self, directory, name, info):
+        """Write <name>.prof, .collapsed and .json into directory; returns the summary."""
+        os.makedirs(directory, exist_ok=True)
+        own = self.data()
+        stats = pstats.Stats(_Raw(own["stats"]))
+        stacks = Counter(own["stacks"])
+        for extra_stats, extra_stacks, root in self._extra:
+            stats.add(_Raw(extra_stats))
+            for stack, count in extra_stacks.items():
+                stacks[root + ";" + stack] += count
+        base = os.path.join(directory, name)
+        stats.dump_stats(base + ".prof")
+        with open(base + ".collapsed", "w", encoding="utf-8") as f:
+            for stack, count in sorted(stacks.items()):
+                f.write("%s %d\n" % (stack, count))
+
+        slowest = sorted(((key, value) for key, value in stats.stats.items()
+                          if not (key[0] == "~" and any(w in key[2] for w in WAITS))),
+                         key=lambda item: item[1][2], reverse=True)
+        summary = dict(info, name=name, seconds=round(self.seconds, 6),
+                       samples=sum(stacks.values()), workers=len(self._extra), slowest=[{
+                           "function": _function_name(key),
+                           "calls": calls,
+                           "self_s": round(tottime, 6),
+                           "total_s": round(cumtime, 6),
+                       } for key, (_, calls, tottime, cumtime, _) in slowest[:TOP_FUNCTIONS]])
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(summary, f)
+        return summary
+
+
+def new_name(label):
+    """A file name for a new profile: time, label (the endpoint), random suffix."""
+    return "%s-%s-%s" % (time.strftime("%Y%m%d-%H%M%S"), label, uuid.uuid4().hex[:6])
+
+
+def profiled(func, *args, **kwargs):
+    """Run func(*args, **kwargs) under a Profile; (result, profile data). Used
+    as a sandbox job, so the work is profiled in the worker process."""
+    profile = Profile()
+    profile.start()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        profile.stop()
+    return result, profile.data()
+
+
+# ── SAVED PROFILES ──
+
+def recent(root, limit=20):
+    """Summaries of the newest saved profiles under root (<job id>/<name>.json)."""
+    paths = sorted(glob.glob(os.path.join(root, "*", "*.json")), key=os.path.getmtime, reverse=True)
+    out = []
+    for path in paths[:limit]:
+        try:
+            with open(path, encoding="utf-8") as f:
+                out.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return out
+
+
+def prune(root, keep):
+    """Delete all but the `keep` newest profiles, and job folders left empty."""
+    paths = sorted(glob.glob(os.path.join(root, "*", "*.json")), key=os.path.getmtime, reverse=True)
+    for path in paths[keep:]:
+        base = path[:-len(".json")]
+        for ext in (".json", ".prof", ".collapsed"):
+            try:
+                os.remove(base + ext)
+            except OSError:
+                pass
+        try:
+            os.rmdir(os.path.dirname(path))
+        except OSError:  # not empty
+            pass
@@ -0,0 +1,250 @@
+"""
+Conversion jobs in isolated worker processes.
+
+analyze_deck and build_deck run in a small pool of worker processes
+instead of the web server, so a deck that hangs or eats memory only takes
+down its own worker. That is the whole scope: the rest of a request's work
+(mapping slides, reading a Text + Graph slide's chart part, previews and
+background premapping) runs in the server, on the analysis the worker sent
+back. Each job has a wall-clock timeout; on Linux the resident memory of
+the worker and of the processes it started is also watched while it runs,
+and a worker over the limit is killed. Workers are replaced after a crash, a kill, or
+max_jobs jobs (lxml's heap only grows), and are always reaped, so nothing is
+left behind as a zombie. Each worker leads its own process group, so
+stopping it also ends whatever it started (build_deck's render processes
+and their fork server). Failures come back as JobError with a kind:
+"timeout", "memory", "crashed" or "error".
+
+Workers are started by a fork server (spawned, where there is none), never
+forked from the web server itself: by the time a worker is replaced the
+server is running threads, and a fork would copy whatever locks they held
+(metrics, logging, lxml) in their held state. Jobs, their arguments and
+the initializer go to the worker pickled, so they must be module-level
+functions. What a job records in metrics.py comes back with its result
+and is added to the server's registry.
+
+Idle workers are reused most-recently-used first, so the one that built a
+deck last, and holds its slide caches (backend_pptx), usually builds the next.
+"""
+
+import os
+import time
+import signal
+import atexit
+import threading
+import traceback
+import multiprocessing
+from multiprocessing.connection import wait
+
+import metrics
+
+POLL = 0.05  # seconds between timeout/memory checks while a job runs
+STOP_GRACE = 2  # seconds a worker gets to exit before it is killed
+ORPHAN_CHECK = 1  # seconds between an idle worker's checks that its parent is alive
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+try:
+    _PAGE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE = 4096
+
+
+class JobError(Exception):
+    """A job that failed in its worker; kind is timeout|memory|crashed|error."""
+
+    def __init__(self, kind, message, trace=""):
+        super().__init__(message)
+        self.kind = kind
+        self.trace = trace
+
+    def to_dict(self):
+        return {"error": str(self), "kind": self.kind}
+
+
+def _serve(conn, initializer):
+    """Worker loop: run (func, args, kwargs) jobs until told to stop (None),
+    or until the process that started it is gone (its pipe may never see EOF:
+    workers started later hold copies of it)."""
+    if hasattr(os, "setsid"):
+        os.setsid()  # a group of its own, with everything it starts: see _Worker.stop
+    parent = os.getppid()
+    if initializer is not None:
+        initializer()
+    metrics.reset()  # what starting up recorded isn't a job's
+    while True:
+        try:
+            if not conn.poll(ORPHAN_CHECK):
+                if os.getppid() != parent:
+                    return
+                continue
+            job = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        except Exception as e:  # a job that doesn't unpickle here
+            conn.send((("error", "Unreadable job: %s" % e, traceback.format_exc()), None))
+            continue
+        if job is None:
+            return
+        func, args, kwargs = job
+        try:
+            result = ("ok", func(*args, **kwargs))
+        except MemoryError:
+            result = ("memory", "Out of memory", traceback.format_exc())
+        except Exception as e:
+            result = ("error", "%s: %s" % (type(e).__name__, e), traceback.format_exc())
+        recorded = metrics.drain()
+        try:
+            conn.send((result, recorded))
+        except Exception as e:  # result that doesn't pickle
+            conn.send((("error", "Unsendable result: %s" % e, traceback.format_exc()), recorded))
+
+
+class _Worker:
+    def __init__(self, ctx, initializer):
+        self.conn, child = ctx.Pipe()
+        # Not a daemon: build_deck may start its own render processes
+        self.process = ctx.Process(target=_serve, args=(child, initializer), name="conversion-worker")
+        self.process.start()
+        child.close()
+        self.jobs = 0
+        self.dead = False
+
+    def rss(self):
+        """Resident set size in bytes of the worker and everything it started
+        (its process group), Linux only; 0 where it can't be read."""
+        try:
+            pids = [p for p in os.listdir("/proc") if p.isdigit()]
+        except OSError:
+            return 0
+        total = 0
+        for pid in pids:
+            try:
+                with open("/proc/%s/stat" % pid) as f:
+                    fields = f.read().rsplit(")", 1)[1].split()  # after the command name
+                if int(fields[2]) == self.process.pid:  # pgrp
+                    total += int(fields[21]) * _PAGE  # rss, in pages
+            except (OSError, ValueError, IndexError):
+                pass  # exited since the listing
+        return total
+
+    def stop(self, kill=False):
+        """End the process and everything it started, and reap it."""
+        self.dead = True
+        if not kill:
+            try:
+                self.conn.send(None)
+            except (OSError, ValueError):
+                pass
+            wait([self.process.sentinel], STOP_GRACE)
+        # Before the join: until the worker is reaped its pid, and so its
+        # group id, can't be reused by another process
+        if hasattr(os, "killpg"):
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+        if self.process.is_alive():  # killed before it got its own group
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+        self.process.close()
+
+
+class WorkerPool:
+    """`size` workers, started up front; run() blocks until one is free.
+
+    timeout is seconds per job, max_rss bytes per worker, max_jobs jobs per
+    worker before it is replaced (None: no limit). initializer, if given,
+    runs in each worker as it starts, before its first job. preload names
+    modules the fork server imports once, so workers start with them loaded.
+    """
+
+    def __init__(self, size, timeout=None, max_rss=None, max_jobs=None, initializer=None, preload=()):
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.max_rss = max_rss
+        self.max_jobs = max_jobs
+        self.initializer = initializer
+        self._ctx = multiprocessing.get_context(START_METHOD)
+        if START_METHOD == "forkserver" and preload:
+            self._ctx.set_forkserver_preload(list(preload))
+        self._cond = threading.Condition()
+        self._idle = [_Worker(self._ctx, initializer) for _ in range(self.size)]
+        self._closed = False
+        self.counts = {"jobs": 0, "timeout": 0, "memory": 0, "crashed": 0, "error": 0, "recycled": 0}
+        atexit.register(self.close)
+
+    def _checkout(self):
+        with self._cond:
+            while not self._idle:
+                if self._closed:
+                    raise JobError("error", "Worker pool is closed")
+                self._cond.wait()
+            return self._idle.pop()
+
+    def _count(self, kind):
+        with self._cond:  # run() is called from many request threads
+            self.counts[kind] += 1
+
+    def _checkin(self, worker):
+        retire = worker.dead or (self.max_jobs and worker.jobs >= self.max_jobs) or (
+            self.max_rss and worker.rss() > self.max_rss)
+        if retire:
+            if not worker.dead:
+                worker.stop()
+                self._count("recycled")
+            worker = None if self._closed else _Worker(self._ctx, self.initializer)
+        with self._cond:
+            if worker is not None:
+                self._idle.append(worker)
+            self._cond.notify()
+
+    def _fail(self, worker, kind, message, trace=""):
+        worker.stop(kill=kind in ("timeout", "memory"))
+        self._count(kind)
+        return JobError(kind, message, trace)
+
+    def run(self, func, *args, **kwargs):
+        """func(*args, **kwargs) in a worker; its result, or raises JobError.
+        func and its arguments and result must pickle."""
+        worker = self._checkout()
+        try:
+            self._count("jobs")
+            try:
+                worker.conn.send((func, args, kwargs))  # pickled whole before anything is written
+            except Exception as e:
+                self._count("error")
+                raise JobError("error", "Job doesn't pickle: %s" % e)
+            deadline = time.monotonic() + self.timeout if self.timeout else None
+            while not worker.conn.poll(POLL):
+                if deadline is not None and time.monotonic() > deadline:
+                    raise self._fail(worker, "timeout", "Timed out after %g s" % self.timeout)
+                if self.max_rss and worker.rss() > self.max_rss:
+                    raise self._fail(worker, "memory", "Over the %d MB memory limit" % (self.max_rss >> 20))
+            try:
+                (status, *payload), recorded = worker.conn.recv()
+            except (EOFError, OSError):
+                worker.process.join(STOP_GRACE)
+                raise self._fail(worker, "crashed", "Worker exited with code %s" % worker.process.exitcode)
+            worker.jobs += 1
+            metrics.merge(recorded)
+            if status != "ok":
+                self._count(status)
+                raise JobError(status, *payload)
+            return payload[0]
+        finally:
+            self._checkin(worker)
+
+    def report(self):
+        """Workers and job outcome counters, ready for JSON."""
+        with self._cond:
+            return dict(self.counts, workers=self.size, idle=len(self._idle))
+
+    def close(self):
+        """Stop every idle worker (busy ones are stopped as their jobs end)."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for worker in idle:
+            worker.stop()
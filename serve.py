@@ -0,0 +1,203 @@
+"""
+Deck Converter — production server.
+Run: python serve.py [--workers N] [--host 0.0.0.0] [--port 5000]
+
+A pre-fork server for app.py. The parent process imports and warms
+everything a first request would touch, then forks the workers:
+  - python-pptx, lxml and the detector, mapper and engine modules
+  - the compiled themes and the stamped shape prototypes
+  - the blank base Presentation of each slide size
+  - font metrics
+It does that by analyzing a small generated deck and building it once in
+every theme. Workers therefore serve their first request at full speed and
+share those pages copy-on-write (gc.freeze keeps the collector from
+touching them). Each worker is a threaded werkzeug server on the shared
+listening socket. A worker that dies is replaced.
+
+With more than one worker, job state has to be shared (jobstore.py): unless
+--job-store is given, jobs are kept in jobs.db next to this file. /metrics
+then adds up every worker's figures from a temporary directory (metrics.py).
+"""
+
+import os
+import gc
+import sys
+import time
+import signal
+import socket
+import argparse
+import shutil
+import tempfile
+
+from pptx import Presentation
+from pptx.util import Pt
+from werkzeug.serving import make_server
+
+import app as webapp
+import engine
+import metrics
+import backend_svg
+import wireframe
+from detector import analyze_deck, SLIDE_TYPES
+from mapper import map_slide
+
+RESPAWN_DELAY = 1  # seconds before replacing a worker that died
+
+
+# ── WARM-UP ──
+
+def _sample_deck(path):
+    """A small deck with the usual slide contents: a title, bullets with numbers, a closer."""
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[0])
+    slide.shapes.title.text = "Quarterly Review"
+    slide.placeholders[1].text = "Findings and next steps"
+    slide = prs.slides.add_slide(prs.slide_layouts[1])
+    slide.shapes.title.text = "What we found"
+    body = slide.placeholders[1].text_frame
+    body.text = "Revenue grew 24% year over year"
+    for line in ("Churn fell to 3.1%", "Two regions missed target", "Hiring is on plan"):
+        body.add_paragraph().text = line
+    for paragraph in body.paragraphs:
+        paragraph.runs[0].font.size = Pt(20)
+    slide = prs.slides.add_slide(prs.slide_layouts[0])
+    slide.shapes.title.text = "Thank you"
+    prs.save(path)
+
+
+def warm():
+    """Run one analysis, preview and build per theme so that every lazily
+    loaded module, table and cache is filled; returns the seconds taken."""
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        sample = os.path.join(tmp, "sample.pptx")
+        _sample_deck(sample)
+        analysis = analyze_deck(sample)
+        for slide_data in analysis:
+            wireframe.render(slide_data)
+        configs = [(t, map_slide(analysis[1], t)) for t in SLIDE_TYPES if t != "skip"]
+        for key in engine.theme_names():
+            theme = engine.load_theme(key)
+            backend_svg.render_slides(theme.render(*configs[0]), theme.width, theme.height)
+            engine.build_deck(key, configs, os.path.join(tmp, key + ".pptx"),
+                              stream=webapp.app.config['STREAM_BUILDS'],
+                              compresslevel=webapp.app.config['BUILD_COMPRESSLEVEL'])
+    return time.perf_counter() - started
+
+
+# ── WORKERS ──
+
+def _listen(host, port):
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(128)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _worker(sock, host, port):
+    """Body of a forked worker: serve until SIGTERM, then stop the job pool."""
+    def stop(signum, frame):
+        raise SystemExit(0)
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    try:
+        if webapp.app.config['ISOLATE_JOBS']:
+            webapp._job_pool()  # start the job workers now, not on the first upload
+        server = make_server(host, port, webapp.app, threaded=True, fd=sock.fileno())
+        server.serve_forever()
+    except SystemExit:
+        pass
+    finally:
+        if webapp._jobs is not None:
+            webapp._jobs.close()
+
+
+def _spawn(sock, host, port):
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _worker(sock, host, port)
+        except BaseException:
+            import traceback
+            traceback.print_exc()
+            code = 1
+        os._exit(code)  # never return into the parent's loop
+    return pid
+
+
+def serve(host, port, workers):
+    """Fork `workers` servers on one listening socket and keep them running."""
+    sock = _listen(host, port)
+    gc.freeze()  # everything loaded so far stays shared with the workers
+    children = {_spawn(sock, host, port) for _ in range(workers)}
+    stopping = []
+
+    def stop(signum, frame):
+        stopping.append(signum)
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not stopping:
+            print("  worker %d exited (status %d), starting another" % (pid, status), file=sys.stderr)
+            time.sleep(RESPAWN_DELAY)
+            children.add(_spawn(sock, host, port))
+    sock.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deck Converter production server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="server processes (default: one per CPU)")
+    parser.add_argument("--job-store", default=None,
+                        help='"memory" (one worker only) or "sqlite:///path/jobs.db"')
+    parser.add_argument("--profile-token", default=None,
+                        help="allow profiling requests that send this token (X-Profile header)")
+    parser.add_argument("--no-warm", action="store_true", help="skip the warm-up run")
+    args = parser.parse_args(argv)
+
+    workers = max(1, args.workers) if hasattr(os, "fork") else 1
+    store = args.job_store
+    if store is None and workers > 1:
+        store = "sqlite:///" + os.path.join(os.path.dirname(os.path.abspath(__file__)), "jobs.db")
+    if store == "memory" and workers > 1:
+        parser.error("--job-store memory can't be shared by %d workers" % workers)
+    webapp.app.config['JOB_STORE'] = store
+    webapp.app.config['PROFILE_TOKEN'] = args.profile_token
+
+    if not args.no_warm:
+        print("  Warmed up in %.1f s" % warm())
+        metrics.reset()  # the warm-up run isn't traffic
+    print("  Deck Converter on http://%s:%d, %d worker(s)" % (args.host, args.port, workers))
+    if workers == 1:
+        if webapp.app.config['ISOLATE_JOBS']:
+            webapp._job_pool()
+        make_server(args.host, args.port, webapp.app, threaded=True).serve_forever()
+    else:
+        webapp.app.config['METRICS_DIR'] = tempfile.mkdtemp(prefix="deck-converter-metrics-")
+        try:
+            serve(args.host, args.port, workers)
+        finally:
+            shutil.rmtree(webapp.app.config['METRICS_DIR'], ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
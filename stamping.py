@@ -0,0 +1,102 @@
+"""
+Pre-built XML shape prototypes ("stamping") for the template builders.
+
+python-pptx's add_shape/add_textbox plus a handful of proxy property writes
+cost far more than the XML they produce. Instead, the recurring shapes are
+parsed once at import; each call deep-copies a prototype, patches its id,
+geometry, text and colour, and appends it straight to the slide's spTree.
+The resulting XML is the same as the python-pptx path produced.
+"""
+
+from copy import deepcopy
+
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
+from pptx.util import Pt
+from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
+
+_AUTOSHAPE_XML = (
+    '<p:sp %s><p:nvSpPr><p:cNvPr id="0" name=""/><p:cNvSpPr/><p:nvPr/></p:nvSpPr>'
+    '<p:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="0" cy="0"/></a:xfrm>'
+    '<a:prstGeom prst="%s">%s</a:prstGeom>'
+    '<a:solidFill><a:srgbClr val="000000"/></a:solidFill><a:ln><a:noFill/></a:ln></p:spPr>'
+    '<p:style><a:lnRef idx="1"><a:schemeClr val="accent1"/></a:lnRef>'
+    '<a:fillRef idx="3"><a:schemeClr val="accent1"/></a:fillRef>'
+    '<a:effectRef idx="2"><a:schemeClr val="accent1"/></a:effectRef>'
+    '<a:fontRef idx="minor"><a:schemeClr val="lt1"/></a:fontRef></p:style>'
+    '<p:txBody><a:bodyPr rtlCol="0" anchor="ctr"/><a:lstStyle/><a:p><a:pPr algn="ctr"/></a:p>'
+    '</p:txBody></p:sp>'
+)
+
+_TEXTBOX_XML = (
+    '<p:sp %s><p:nvSpPr><p:cNvPr id="0" name=""/><p:cNvSpPr txBox="1"/><p:nvPr/></p:nvSpPr>'
+    '<p:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="0" cy="0"/></a:xfrm>'
+    '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom><a:noFill/></p:spPr>'
+    '<p:txBody><a:bodyPr wrap="square" anchor="t"><a:spAutoFit/></a:bodyPr><a:lstStyle/>'
+    '<a:p><a:pPr algn="l"><a:defRPr sz="1200" b="0" i="0">'
+    '<a:solidFill><a:srgbClr val="000000"/></a:solidFill><a:latin typeface=""/>'
+    '</a:defRPr></a:pPr></a:p></p:txBody></p:sp>'
+) % nsdecls("p", "a", "r")
+
+_LNSPC_XML = '<a:lnSpc %s><a:spcPts val="0"/></a:lnSpc>' % nsdecls("a")
+
+# name prefix, prototype element
+RECT = ("Rectangle", parse_xml(_AUTOSHAPE_XML % (nsdecls("p", "a", "r"), "rect", "<a:avLst/>")))
+OVAL = ("Oval", parse_xml(_AUTOSHAPE_XML % (nsdecls("p", "a", "r"), "ellipse", "<a:avLst/>")))
+ROUNDED_RECT = ("Rounded Rectangle", parse_xml(_AUTOSHAPE_XML % (
+    nsdecls("p", "a", "r"), "roundRect", '<a:avLst><a:gd name="adj" fmla="val 5000"/></a:avLst>')))
+TEXT_BOX = ("TextBox", parse_xml(_TEXTBOX_XML))
+LINE_SPACING = parse_xml(_LNSPC_XML)
+
+ANCHORS = {MSO_ANCHOR.TOP: 't', MSO_ANCHOR.MIDDLE: 'ctr', MSO_ANCHOR.BOTTOM: 'b'}
+
+
+def _place(slide, prototype, x, y, w, h):
+    """Copy a prototype, give it the next shape id and geometry, append it to spTree."""
+    prefix, proto = prototype
+    shapes = slide.shapes
+    # python-pptx's turbo mode caches the max shape id instead of an xpath per shape;
+    # safe because every shape added by the builders goes through _next_shape_id
+    if not shapes.turbo_add_enabled:
+        shapes.turbo_add_enabled = True
+    shape_id = shapes._next_shape_id
+    sp = deepcopy(proto)
+    cNvPr = sp[0][0]
+    cNvPr.set("id", str(shape_id))
+    cNvPr.set("name", "%s %d" % (prefix, shape_id - 1))
+    xfrm = sp[1][0]
+    off, ext = xfrm[0], xfrm[1]
+    off.set("x", str(int(x))); off.set("y", str(int(y)))
+    ext.set("cx", str(int(w))); ext.set("cy", str(int(h)))
+    shapes._spTree.append(sp)
+    return sp
+
+
+def stamp_shape(slide, prototype, x, y, w, h, fill_color):
+    """Solid-filled autoshape with no outline (RECT, OVAL or ROUNDED_RECT)."""
+    sp = _place(slide, prototype, x, y, w, h)
+    sp[1][2][0].set("val", str(fill_color))
+    return sp
+
+
+def stamp_text(slide, x, y, w, h, text, font_name, font_size, color, bold=False,
+               italic=False, align=PP_ALIGN.LEFT, valign=MSO_ANCHOR.TOP, line_spacing=None):
+    """Word-wrapped single-paragraph text box."""
+    sp = _place(slide, TEXT_BOX, x, y, w, h)
+    txBody = sp[2]
+    txBody[0].set("anchor", ANCHORS.get(valign, 't'))
+    p = txBody[2]
+    pPr = p[0]
+    pPr.set("algn", PP_ALIGN.to_xml(align))
+    if line_spacing:
+        lnSpc = deepcopy(LINE_SPACING)
+        lnSpc[0].set("val", str(Pt(line_spacing).centipoints))
+        pPr.insert(0, lnSpc)
+    defRPr = pPr[-1]
+    defRPr.set("sz", str(Pt(font_size).centipoints))
+    defRPr.set("b", "1" if bold else "0")
+    defRPr.set("i", "1" if italic else "0")
+    defRPr[0][0].set("val", str(color))
+    defRPr[1].set("typeface", font_name)
+    p.append_text(text)
+    return sp
@@ -0,0 +1,95 @@
+"""
+Streaming package writer: a deck goes to the zip one slide at a time.
+
+python-pptx's save() serializes every part at the very end, so a big deck
+keeps all of its slide trees (and chart workbooks) alive until then. Here
+each new slide and the parts hanging off it (charts, workbooks, pictures) are
+written as soon as the slide is finished, then swapped in the package for a
+stub that keeps only the part's name, content type and relationships, so
+python-pptx can still allocate partnames around them. The presentation part,
+the rest of the base deck and [Content_Types].xml are written on close().
+"""
+
+import zipfile
+from collections import namedtuple
+
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT, RELATIONSHIP_TARGET_MODE as RTM
+from pptx.opc.package import Part, _Relationship
+from pptx.opc.packuri import PACKAGE_URI, CONTENT_TYPES_URI
+from pptx.opc.serialized import _ContentTypesItem
+from pptx.opc.oxml import serialize_part_xml
+
+_Entry = namedtuple("_Entry", "partname content_type")
+
+
+class _Streamed(Part):
+    """Stands in for a part already in the zip: same name, type and rels, no content."""
+
+    def __init__(self, part, rels):
+        super().__init__(part.partname, part.content_type, part.package)
+        self._streamed_rels = rels
+
+    @property
+    def rels(self):
+        return self._streamed_rels
+
+
+def _retarget(rels, rel, stream):
+    """Point `rel` at the stub stream() returns for its target (rels cache their target)."""
+    rels._rels[rel.rId] = _Relationship(rels._base_uri, rel.rId, rel.reltype, RTM.INTERNAL,
+                                        stream(rel.target_part))
+
+
+class PackageStream:
+    """Writes `prs` to `output_path`: flush() after adding slides, close() once at the end.
+
+    compresslevel is zlib's 0-9 (None: zlib's default, as python-pptx writes).
+    """
+
+    def __init__(self, prs, output_path, compresslevel=None):
+        self.prs = prs
+        self.zip = zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED,
+                                   compresslevel=compresslevel, strict_timestamps=False)
+        self.written = {}  # partname -> content type
+        self.flushed = 0   # slides streamed so far
+
+    def flush(self):
+        """Stream every slide added since the last flush and release its parts."""
+        sld_ids = self.prs.slides._sldIdLst
+        rels = self.prs.part.rels
+        for sld_id in sld_ids[self.flushed:]:
+            _retarget(rels, rels[sld_id.rId], self._stream)
+        self.flushed = len(sld_ids)
+
+    def close(self):
+        """Write the rest of the package and [Content_Types].xml, then close the zip."""
+        self.flush()
+        package = self.prs.part.package
+        for part in package.iter_parts():
+            if part.partname not in self.written:
+                self._write(part, part.rels)
+        self._put(PACKAGE_URI.rels_uri, package._rels.xml)
+        entries = [_Entry(name, ct) for name, ct in self.written.items()]
+        self._put(CONTENT_TYPES_URI, serialize_part_xml(_ContentTypesItem.xml_for(entries)))
+        self.zip.close()
+
+    def _stream(self, part):
+        """Write `part` and the new parts it relates to; return its stub."""
+        rels = part.rels
+        for rel in rels.values():
+            if rel.is_external or rel.reltype == RT.SLIDE_LAYOUT:
+                continue
+            # Shared parts (a picture used on several slides) are written once and kept
+            if rel.target_part.partname not in self.written:
+                _retarget(rels, rel, self._stream)
+        self._write(part, rels)
+        return _Streamed(part, rels)
+
+    def _write(self, part, rels):
+        self._put(part.partname, part.blob)
+        if len(rels):
+            self._put(part.partname.rels_uri, rels.xml)
+        self.written[part.partname] = part.content_type
+
+    def _put(self, partname, blob):
+        self.zip.writestr(partname.membername, blob)
@@ -0,0 +1,330 @@
+"""
+Text measurement and auto-fit for the theme engine.
+
+A text box's text is word-wrapped with per-font glyph advance widths (from
+the font file: a minimal TrueType/OpenType reader for head, hhea, hmtx, cmap
+and name) and the largest whole point size at which it fits the box is found
+by binary search. Fonts are looked up by family name in the usual system and
+Office font folders; a family that isn't installed is measured as Calibri,
+and if Calibri isn't either, with built-in approximate Calibri widths.
+
+Everything is lazy and memoized: the font folders are indexed on the first
+lookup, a font's tables are parsed on its first use, a text's word widths
+once per (text, font) and a fit once per (text, font, box, size). Indexing
+walks every font folder, so processes that fit text call warm() with their
+themes' families when they start, not on their first request.
+"""
+
+import os
+import sys
+import mmap
+import struct
+from collections import namedtuple
+from functools import lru_cache
+
+EMU_PER_PT = 12700
+# Default text box insets (0.1in left/right, 0.05in top/bottom), both sides
+INSET_W = 2 * 91440
+INSET_H = 2 * 45720
+LINE_HEIGHT = 1.2  # single line spacing, as a multiple of the font size
+FALLBACK_FAMILY = "Calibri"
+
+_FONT_EXTS = (".ttf", ".otf", ".ttc")
+
+# Advance width per character in em, plus the width of anything unmapped
+Metrics = namedtuple("Metrics", "widths default")
+
+# Approximate Calibri advances (units per em 2048), for when no font file is found
+_APPROX_UPM = 2048
+_APPROX = {
+    " ": 463, "a": 981, "b": 1076, "c": 866, "d": 1076, "e": 1019, "f": 625, "g": 964,
+    "h": 1076, "i": 470, "j": 490, "k": 931, "l": 470, "m": 1636, "n": 1076, "o": 1080,
+    "p": 1076, "q": 1076, "r": 714, "s": 801, "t": 686, "u": 1076, "v": 925, "w": 1464,
+    "x": 887, "y": 927, "z": 809, "A": 1185, "B": 1114, "C": 1092, "D": 1260, "E": 1000,
+    "F": 941, "G": 1292, "H": 1276, "I": 516, "J": 653, "K": 1064, "L": 861, "M": 1751,
+    "N": 1322, "O": 1356, "P": 1058, "Q": 1378, "R": 1112, "S": 941, "T": 998, "U": 1314,
+    "V": 1162, "W": 1822, "X": 1063, "Y": 998, "Z": 959, ".": 517, ",": 511, ":": 548,
+    ";": 548, "-": 627, "–": 1024, "—": 2048, "(": 621, ")": 621, "%": 1468, "!": 545,
+    "?": 941, "'": 452, '"': 821, "/": 792, "&": 1397, "’": 511, "“": 821, "”": 821,
+}
+_APPROX.update((d, 1038) for d in "0123456789")
+_APPROX_BOLD = 1.04  # Calibri Bold runs about this much wider
+
+
+def _font_dirs():
+    home = os.path.expanduser("~")
+    if sys.platform == "win32":
+        windir = os.environ.get("WINDIR", r"C:\Windows")
+        local = os.environ.get("LOCALAPPDATA", "")
+        return [os.path.join(windir, "Fonts"), os.path.join(local, "Microsoft", "Windows", "Fonts")]
+    if sys.platform == "darwin":
+        return ["/Library/Fonts", "/System/Library/Fonts", os.path.join(home, "Library", "Fonts"),
+                "/Applications/Microsoft PowerPoint.app/Contents/Resources/DFonts"]
+    return ["/usr/share/fonts", "/usr/local/share/fonts", os.path.join(home, ".fonts"),
+            os.path.join(home, ".local", "share", "fonts")]
+
+
+# ── FONT FILES ──
+
+def _tables(data, offset):
+    """{tag: table offset} of the font starting at `offset`."""
+    count = struct.unpack_from(">H", data, offset + 4)[0]
+    tables = {}
+    for i in range(count):
+        tag, _, table_offset, _ = struct.unpack_from(">4sIII", data, offset + 12 + 16 * i)
+        tables[tag.decode("latin-1")] = table_offset
+    return tables
+
+
+def _faces(data):
+    """Offsets of the fonts in a file: one, or several in a .ttc collection."""
+    if data[:4] == b"ttcf":
+        count = struct.unpack_from(">I", data, 8)[0]
+        return struct.unpack_from(">%dI" % count, data, 12)
+    return (0,)
+
+
+def _family(data, tables):
+    """Legacy family name (name ID 1), English if there is a choice."""
+    base = tables["name"]
+    _, count, strings = struct.unpack_from(">HHH", data, base)
+    found = None
+    for i in range(count):
+        platform, _, language, name_id, length, offset = struct.unpack_from(">6H", data, base + 6 + 12 * i)
+        if name_id != 1:
+            continue
+        raw = data[base + strings + offset:base + strings + offset + length]
+        if platform in (0, 3):
+            name = raw.decode("utf-16-be", "replace")
+        elif platform == 1:
+            name = raw.decode("mac_roman", "replace")
+        else:
+            continue
+        if language in (0, 0x409):
+            return name
+        found = found or name
+    return found
+
+
+@lru_cache(maxsize=None)
+def _font_index():
+    """{(family lowercased, bold): (path, offset)} of the upright fonts installed."""
+    index = {}
+    for root_dir in _font_dirs():
+        for root, _, files in os.walk(root_dir):
+            for name in files:
+                if not name.lower().endswith(_FONT_EXTS):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                        for offset in _faces(data):
+                            tables = _tables(data, offset)
+                            mac_style = struct.unpack_from(">H", data, tables["head"] + 44)[0]
+                            family = _family(data, tables)
+                            if family and not mac_style & 2:  # skip italics
+                                index.setdefault((family.lower(), bool(mac_style & 1)), (path, offset))
+                except (OSError, ValueError, KeyError, struct.error):
+                    continue
+    return index
+
+
+def _cmap(data, base):
+    """{codepoint: glyph id} from the best Unicode subtable (format 12 or 4)."""
+    _, count = struct.unpack_from(">HH", data, base)
+    subtables = {}
+    for i in range(count):
+        platform, encoding, offset = struct.unpack_from(">HHI", data, base + 4 + 8 * i)
+        subtables[(platform, encoding)] = base + offset
+    glyphs = {}
+    for key in ((3, 10), (0, 4), (0, 6), (3, 1), (0, 3), (0, 1), (0, 0)):
+        o = subtables.get(key)
+        if o is None:
+            continue
+        fmt = struct.unpack_from(">H", data, o)[0]
+        if fmt == 12:
+            groups = struct.unpack_from(">I", data, o + 12)[0]
+            for i in range(groups):
+                start, end, glyph = struct.unpack_from(">III", data, o + 16 + 12 * i)
+                for cp in range(start, min(end, 0x2FFFF) + 1):
+                    glyphs[cp] = glyph + cp - start
+            return glyphs
+        if fmt == 4:
+            segs = struct.unpack_from(">H", data, o + 6)[0] // 2
+            ends = struct.unpack_from(">%dH" % segs, data, o + 14)
+            starts = struct.unpack_from(">%dH" % segs, data, o + 16 + 2 * segs)
+            deltas = struct.unpack_from(">%dh" % segs, data, o + 16 + 4 * segs)
+            range_base = o + 16 + 6 * segs
+            ranges = struct.unpack_from(">%dH" % segs, data, range_base)
+            for i in range(segs):
+                for cp in range(starts[i], min(ends[i], 0xFFFE) + 1):
+                    if ranges[i] == 0:
+                        glyph = (cp + deltas[i]) & 0xFFFF
+                    else:
+                        at = range_base + 2 * i + ranges[i] + 2 * (cp - starts[i])
+                        glyph = struct.unpack_from(">H", data, at)[0]
+                        glyph = (glyph + deltas[i]) & 0xFFFF if glyph else 0
+                    if glyph:
+                        glyphs[cp] = glyph
+            return glyphs
+    return glyphs
+
+
+def _read_metrics(path, offset):
+    with open(path, "rb") as f:
+        data = f.read()
+    tables = _tables(data, offset)
+    upm = struct.unpack_from(">H", data, tables["head"] + 18)[0]
+    n_metrics = struct.unpack_from(">H", data, tables["hhea"] + 34)[0]
+    advances = struct.unpack_from(">" + "Hh" * n_metrics, data, tables["hmtx"])[::2]
+    last = advances[-1]
+    widths = {chr(cp): (advances[g] if g < n_metrics else last) / upm
+              for cp, g in _cmap(data, tables["cmap"]).items()}
+    return Metrics(widths, advances[0] / upm)
+
+
+@lru_cache(maxsize=None)
+def metrics(family, bold=False):
+    """Glyph advances of an installed font, else Calibri's, else approximate Calibri's."""
+    index = _font_index()
+    for name in (family, FALLBACK_FAMILY):
+        found = index.get((name.lower(), bold)) or index.get((name.lower(), False))
+        if found:
+            try:
+                return _read_metrics(*found)
+            except (OSError, KeyError, struct.error):
+                pass
+    scale = (_APPROX_BOLD if bold else 1.0) / _APPROX_UPM
+    return Metrics({ch: w * scale for ch, w in _APPROX.items()}, 1000 * scale)
+
+
+def warm(families):
+    """Index the font folders and read the metrics of `families` (regular
+    and bold) now."""
+    for family in families:
+        for bold in (False, True):
+            metrics(family, bold)
+
+
+# ── MEASUREMENT ──
+
+@lru_cache(maxsize=16384)
+def _paragraphs(runs, font):
+    """Text of ((text, bold), ...) runs as paragraphs of (word width, trailing space width) in em."""
+    paragraphs, words = [], []
+    word = space = 0.0
+    for text, bold in runs:
+        m = metrics(font, bool(bold))
+        widths, default = m.widths, m.default
+        for ch in text:
+            if ch == "\n" or ch == "\v":
+                words.append((word, space)); paragraphs.append(tuple(words))
+                words, word, space = [], 0.0, 0.0
+            elif ch == " " or ch == "\t":
+                space += widths.get(" ", default)
+            else:
+                if space:
+                    words.append((word, space)); word = space = 0.0
+                word += widths.get(ch, default)
+    words.append((word, space))
+    paragraphs.append(tuple(words))
+    return tuple(paragraphs)
+
+
+def _line_count(paragraphs, width):
+    """Lines the paragraphs wrap to in `width` em (words longer than a line break mid-word)."""
+    lines = 0
+    for words in paragraphs:
+        n, x = 1, 0.0
+        for word, space in words:
+            if x and x + word > width:
+                n += 1; x = 0.0
+            while word > width:
+                n += 1; word -= width
+            x += word + space
+        lines += n
+    return lines
+
+
+def line_count(runs, font, size, w):
+    """Lines `runs` wrap to at `size` pt in a text box `w` EMU wide."""
+    width = (w - INSET_W) / EMU_PER_PT / size
+    return _line_count(_paragraphs(runs, font), width) if width > 0 else 0
+
+
+def wrap(runs, font, size, w):
+    """The lines `runs` wrap to at `size` pt in a text box `w` EMU wide, each as
+    ((text, bold), ...) without trailing spaces. Same word breaks as
+    line_count(); a word longer than a line breaks between characters."""
+    width = (w - INSET_W) / EMU_PER_PT / size
+    lines, line, word, x = [], [], [], 0.0  # line/word: [(char, bold, width em)]
+
+    def end_word():
+        # A word is its characters plus the spaces after it, as in _paragraphs()
+        nonlocal x
+        if x and x + sum(cw for ch, _, cw in word if ch != " ") > width:
+            lines.append(line[:]); del line[:]; x = 0.0
+        for ch, bold, cw in word:
+            if x and ch != " " and x + cw > width:  # longer than a line: break mid-word
+                lines.append(line[:]); del line[:]; x = 0.0
+            line.append((ch, bold, cw)); x += cw
+        del word[:]
+
+    for text, bold in runs:
+        m = metrics(font, bool(bold))
+        widths, default = m.widths, m.default
+        for ch in text:
+            if ch == "\n" or ch == "\v":
+                end_word(); lines.append(line[:]); del line[:]; x = 0.0
+            elif ch == " " or ch == "\t":
+                word.append((" ", bold, widths.get(" ", default)))
+            else:
+                if word and word[-1][0] == " ":
+                    end_word()
+                word.append((ch, bold, widths.get(ch, default)))
+    end_word()
+    lines.append(line)
+
+    out = []
+    for line in lines:
+        merged = []
+        for ch, bold, _ in line:
+            if merged and merged[-1][1] == bold:
+                merged[-1][0] += ch
+            else:
+                merged.append([ch, bold])
+        while merged and not merged[-1][0].rstrip():
+            merged.pop()
+        if merged:
+            merged[-1][0] = merged[-1][0].rstrip()
+        out.append(tuple((text, bold) for text, bold in merged))
+    return out
+
+
+@lru_cache(maxsize=16384)
+def fit_size(runs, font, w, h, size, min_size, spacing=None):
+    """Largest whole point size from min_size up to `size` at which `runs` fit a
+    w x h (EMU) text box; min_size if none does. `spacing` is the fixed line
+    spacing in pt at `size`, scaled with the font (None: single spacing)."""
+    paragraphs = _paragraphs(runs, font)
+    width = (w - INSET_W) / EMU_PER_PT
+    height = (h - INSET_H) / EMU_PER_PT
+    if width <= 0:
+        return min_size
+
+    def fits(s):
+        # One line fits whatever the box height: only wrapping is fixed by shrinking
+        lines = _line_count(paragraphs, width / s)
+        line = spacing * s / size if spacing else s * LINE_HEIGHT
+        return lines == 1 or lines * line <= height
+
+    if fits(size):
+        return size
+    lo, hi = int(min_size), int(size) - 1
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if fits(mid):
+            lo = mid
+        else:
+            hi = mid - 1
+    return max(lo, min_size)
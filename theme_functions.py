@@ -0,0 +1,114 @@
+"""
+The computed parts of theme layouts: geometry that depends on how many
+items a slide has, and the few values that aren't a plain field of the
+slide config. Theme files call them by name ({"fn": "stack", ...}); the
+other arguments of that object are passed as keyword arguments.
+
+Lengths arrive in EMU (theme metrics, or [inches, ...] lists in the theme),
+except where a docstring says inches. All of these are pure: a call whose
+arguments only use theme names is made once, when the theme is compiled.
+"""
+
+from pptx.util import Inches, Emu
+
+ROW_BIAS = 0.3  # share of the spare height above a stack of rows (the rest is below)
+
+
+# ── GEOMETRY ──
+
+def nth(start, pitch, i):
+    """Position of the i-th of a run of items `pitch` apart, from `start`."""
+    return Emu(start + i * pitch)
+
+
+def center(at, outer, inner):
+    """Where something `inner` long starts to sit centred in `outer` from `at`."""
+    return Emu(at + (outer - inner) // 2)
+
+
+def stack(count, top, space, gap, max_h, fit_gaps=True):
+    """Rows for `count` items in `space` below `top`: {"top", "h", "pitch"}.
+    Rows are as tall as fits (at most max_h) and the spare height is split
+    ROW_BIAS above, the rest below. With fit_gaps=False the row height
+    ignores the gaps, so many rows run past the space."""
+    if not count:
+        return {"top": Emu(top), "h": 0, "pitch": 0}
+    free = space - (count - 1) * gap if fit_gaps else space
+    h = min(int(free / count), max_h)
+    return {"top": Emu(top + int((space - (count * h + (count - 1) * gap)) * ROW_BIAS)),
+            "h": h, "pitch": h + gap}
+
+
+def grid(i, cols, left, top, col_pitch, row_pitch):
+    """{"x", "y"} of the i-th cell of a grid filled row by row."""
+    return {"x": Emu(left + i % cols * col_pitch), "y": Emu(top + i // cols * row_pitch)}
+
+
+def column(i, count, left, width, gap):
+    """{"x", "w"} of the i-th of `count` equal columns across `width` with
+    `gap` between them; left, width and gap in inches."""
+    w = (width - (count - 1) * gap) / count
+    return {"x": Inches(left + i * (w + gap)), "w": Inches(w)}
+
+
+# ── VALUES ──
+
+def count(of, most=None):
+    """Number of items (None counts as none), at most `most`."""
+    n = len(of or ())
+    return n if most is None else min(n, most)
+
+
+def cycle(of, i):
+    """The i-th of a palette, wrapping around."""
+    return of[i % len(of)]
+
+
+def pick(when, then, otherwise):
+    return then if when else otherwise
+
+
+def less(a, b):
+    return a < b
+
+
+def scaled(value, by, least):
+    """int(value * by), but at least `least` (a shrink-to-fit floor for a size)."""
+    return max(least, int(value * by))
+
+
+def lookup(table, key):
+    """table[key], or table["*"] for keys it doesn't have."""
+    return table.get(key, table.get("*"))
+
+
+def concat(a, b):
+    return str(a) + str(b)
+
+
+def coalesce(a, b):
+    """a, unless it is missing."""
+    return b if a is None else a
+
+
+def lines(a, b):
+    """The non-empty ones of a and b, one per line."""
+    return "\n".join(filter(None, (a, b)))
+
+
+def as_list(value):
+    """A list as is, nothing as [], anything else as a list of one."""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def text_field(value, key):
+    """Text as is, else the `key` field of a dict."""
+    return value if isinstance(value, str) else (value or {}).get(key)
+
+
+FUNCTIONS = {f.__name__: f for f in (
+    nth, center, stack, grid, column, count, cycle, pick, less, scaled, lookup,
+    concat, coalesce, lines, as_list, text_field,
+)}
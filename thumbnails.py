@@ -0,0 +1,130 @@
+"""
+LibreOffice thumbnails of uploaded decks, rendered on an asyncio event loop.
+
+soffice (to PDF) and pdftoppm (to JPEGs) run as asyncio subprocesses, so a
+job waiting on them, or queued behind the "thumbnails" admission gate,
+holds no thread: one loop thread per process keeps any number of jobs in
+flight. LibreOffice won't run two instances on one user profile, so every
+running job takes a profile from a pool of as many as the gate admits at
+once; they live in a temporary directory for the life of the process.
+"""
+
+import os
+import glob
+import atexit
+import shutil
+import asyncio
+import pathlib
+import tempfile
+import threading
+import subprocess
+from functools import lru_cache
+
+import admission
+import metrics
+
+SOFFICE_CANDIDATES = ('soffice', '/Applications/LibreOffice.app/Contents/MacOS/soffice',
+                      'libreoffice', '/usr/bin/libreoffice')
+CONVERT_TIMEOUT = 30  # seconds for each of soffice and pdftoppm
+
+
+@lru_cache(maxsize=None)
+def find_soffice():
+    """The LibreOffice command, or None if it isn't installed."""
+    for cmd in SOFFICE_CANDIDATES:
+        try:
+            subprocess.run([cmd, '--version'], capture_output=True, timeout=5)
+            return cmd
+        except (FileNotFoundError, subprocess.TimeoutExpired):
+            continue
+    return None
+
+
+async def _run(*cmd):
+    """Run a command to completion, killing it after CONVERT_TIMEOUT."""
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        return await asyncio.wait_for(proc.wait(), CONVERT_TIMEOUT)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+
+
+async def render(pptx_path, thumb_dir, profile):
+    """Write slide-NN.jpg thumbnails of a deck into thumb_dir; True if any were made."""
+    soffice = await asyncio.get_running_loop().run_in_executor(None, find_soffice)
+    if not soffice:
+        return False
+
+    os.makedirs(thumb_dir, exist_ok=True)
+    for f in glob.glob(os.path.join(thumb_dir, 'slide-*')):
+        os.remove(f)
+
+    try:
+        with metrics.timer("soffice_seconds"):
+            await _run(soffice, '-env:UserInstallation=' + pathlib.Path(profile).as_uri(),
+                       '--headless', '--convert-to', 'pdf', '--outdir', thumb_dir, pptx_path)
+        # The PDF is named after the deck, but don't rely on it
+        pdfs = glob.glob(os.path.join(thumb_dir, '*.pdf'))
+        if pdfs:
+            with metrics.timer("pdftoppm_seconds"):
+                await _run('pdftoppm', '-jpeg', '-r', '120', pdfs[0], os.path.join(thumb_dir, 'slide'))
+    except asyncio.TimeoutError:
+        metrics.inc("errors_total", stage="thumbnails", kind="timeout")
+        return False
+    except FileNotFoundError:
+        metrics.inc("errors_total", stage="thumbnails", kind="error")
+        return False
+    if glob.glob(os.path.join(thumb_dir, 'slide-*.jpg')):
+        return True
+    metrics.inc("errors_total", stage="thumbnails", kind="error")
+    return False
+
+
+class Renderer:
+    """Thumbnail jobs on a background event loop, admitted through `gate`."""
+
+    def __init__(self, gate):
+        self.gate = gate
+        self._loop = None
+        self._lock = threading.Lock()
+        self._profiles = None  # asyncio.Queue of profile directories, made on the loop
+        self._profile_root = None
+
+    def _start(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="thumbnails", daemon=True).start()
+                self._profile_root = tempfile.mkdtemp(prefix="deck-converter-lo-")
+                atexit.register(shutil.rmtree, self._profile_root, True)
+                self._loop = loop
+            return self._loop
+
+    def submit(self, pptx_path, thumb_dir, client, done):
+        """Render in the background; done(status) is called in a worker thread
+        with "ready" or "unavailable" (also when the gate's queue is full)."""
+        return asyncio.run_coroutine_threadsafe(
+            self._job(pptx_path, thumb_dir, client, done), self._start())
+
+    async def _job(self, pptx_path, thumb_dir, client, done):
+        if self._profiles is None:
+            self._profiles = asyncio.Queue()
+            for i in range(self.gate.limit):
+                self._profiles.put_nowait(os.path.join(self._profile_root, str(i)))
+        status = "unavailable"
+        try:
+            async with self.gate.aslot(client):
+                if os.path.exists(pptx_path):  # not dropped from the job store meanwhile
+                    profile = await self._profiles.get()
+                    try:
+                        if await render(pptx_path, thumb_dir, profile):
+                            status = "ready"
+                    finally:
+                        self._profiles.put_nowait(profile)
+        except admission.Rejected:
+            metrics.inc("errors_total", stage="thumbnails", kind="busy")
+        # done() may block (the job store), so not on the loop
+        await asyncio.get_running_loop().run_in_executor(None, done, status)
@@ -0,0 +1,53 @@
+"""
+Wireframe thumbnails of the uploaded deck's slides, drawn from what
+extract_slides already collected: every text box at its position with its
+text (shrunk to its box like PowerPoint's autofit would), and the bounding
+boxes of pictures and charts. They are display lists drawn by backend_svg,
+so a whole deck takes milliseconds; the UI shows them at once and swaps in
+LibreOffice's rendered thumbnails if those arrive.
+"""
+
+import backend_svg
+from display import Shape, Text
+from textfit import EMU_PER_PT, LINE_HEIGHT, fit_size
+
+DEFAULT_SIZE = (12192000, 6858000)  # 13.333in x 7.5in, for slides without a recorded size
+FONT = "Calibri"
+TEXT_COLOR = "403F3E"
+BODY_SIZE = 18  # pt, for text boxes with no font size on record
+MIN_SIZE = 6
+PICTURE_FILL, PICTURE_COLOR = "EDE4F5", "5B2C8F"
+CHART_FILL, CHART_COLOR = "E0EAFC", "3880F3"
+
+
+def _placeholder(ref, fill, color, label):
+    x, y, w, h = ref["left"], ref["top"], ref["width"], ref["height"]
+    return (Shape("rect", x, y, w, h, fill),
+            Text("text", x, y, w, h, label, FONT, 12, color, True, False, "center", "middle", None))
+
+
+def slide_items(slide_data):
+    """Display list of one analyzed slide's wireframe."""
+    items = []
+    for ref in slide_data.get("images", []):
+        items.extend(_placeholder(ref, PICTURE_FILL, PICTURE_COLOR, "Picture"))
+    for ref in slide_data.get("charts", []):
+        items.extend(_placeholder(ref, CHART_FILL, CHART_COLOR, "Chart"))
+    for box in slide_data.get("raw_boxes", []):
+        x, y, w = int(box.get("left") or 0), int(box.get("top") or 0), int(box.get("width") or 0)
+        text = box["text"]
+        size = box.get("max_font_size") or BODY_SIZE
+        h = int(box.get("height") or 0) or int(len(box["paragraphs"]) * size * LINE_HEIGHT * EMU_PER_PT)
+        if w <= 0:
+            continue
+        title = box.get("placeholder_idx") == 0
+        size = fit_size(((text, title),), FONT, w, h, size, MIN_SIZE)
+        items.append(Text("text", x, y, w, h, text, FONT, size, TEXT_COLOR, title, False,
+                          "left", "top", None))
+    return tuple(items)
+
+
+def render(slide_data):
+    """SVG wireframe of one analyzed slide (an analyze_deck() result)."""
+    width, height = slide_data.get("slide_size") or DEFAULT_SIZE
+    return backend_svg.render_slide(slide_items(slide_data), width, height)